@@ -0,0 +1,55 @@
+"""Example checking drop_greek_accents against its reference implementation.
+
+Runs both over every distinct form and lemma in the database and reports
+mismatches. The translate-table version must match exactly: any mismatch
+exits with status 1.
+"""
+
+import sqlite3
+import sys
+import time
+
+from dictionary.accentless import (
+    _drop_greek_accents_reference,
+    drop_greek_accents,
+    drop_greek_accents_batch,
+)
+from dictionary.config import db_path
+
+
+def main():
+    """Compare fast and reference accent removal over the whole vocabulary."""
+    if not db_path.exists():
+        print(f"Error: Database not found at {db_path}")
+        return
+
+    db_uri = f"file:{db_path}?mode=ro"
+    with sqlite3.connect(db_uri, uri=True) as conn:
+        cursor = conn.execute("SELECT form FROM words UNION SELECT lemma FROM words")
+        vocabulary = [value for (value,) in cursor if value]
+
+    start = time.perf_counter()
+    expected = [_drop_greek_accents_reference(word) for word in vocabulary]
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = drop_greek_accents_batch(vocabulary)
+    batch_time = time.perf_counter() - start
+
+    mismatches = [
+        (word, want, got)
+        for word, want, got in zip(vocabulary, expected, batch)
+        if want != got or drop_greek_accents(word) != want
+    ]
+
+    print(f"Vocabulary size: {len(vocabulary)}")
+    print(f"Reference: {reference_time:.3f}s, translate table: {batch_time:.3f}s")
+    print(f"Mismatches: {len(mismatches)}")
+    for word, want, got in mismatches[:20]:
+        print(f"  {word!r}: expected {want!r}, got {got!r}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
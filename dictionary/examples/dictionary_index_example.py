@@ -0,0 +1,41 @@
+import sys
+import time
+
+from dictionary.dictionary import create_dictionary
+from dictionary.dictionary_index import ANNOTATION_FIELDS, DictionaryIndex
+
+
+def main():
+    """Look up forms given on the command line (default: the top 5 words).
+    Print matching words with their annotations and lemma.
+    """
+    print("Loading dictionary...")
+    dictionary = create_dictionary()
+
+    start = time.perf_counter()
+    index = DictionaryIndex(dictionary)
+    print(f"Index built in {time.perf_counter() - start:.3f}s")
+
+    forms = sys.argv[1:] or dict.fromkeys(w.form for w in dictionary.words[:5])
+    for form in forms:
+        print("\n" + "=" * 60)
+        matches = index.word_indices(form) or index.accentless_word_indices(form)
+        print(f"{form}: {len(matches)} word(s)")
+        print("=" * 60)
+        for idx in matches:
+            word = dictionary.words[idx]
+            annotations = {
+                field: getattr(word, field).value
+                for field in ANNOTATION_FIELDS
+                if getattr(word, field) is not None
+            }
+            print(f"  {word.form} {word.pos_en.value} {annotations}")
+            if word.lemma_index == -1:
+                continue
+            lemma = dictionary.lemmas[word.lemma_index]
+            assert index.lemma_index(lemma.lemma, lemma.pos_en) == word.lemma_index
+            print(f"    lemma: {lemma.lemma} ({lemma.pos_en.value})")
+
+
+if __name__ == "__main__":
+    main()
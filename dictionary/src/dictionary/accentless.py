@@ -1,40 +1,42 @@
-import sqlite3
+import re
 import unicodedata
+from typing import Iterable
 
 from dictionary.config import accentless_cache_path, db_path
-from dictionary.utils import cache_to_file
+from dictionary.db import FORM_LEMMA_PAIRS_QUERY, get_connection
+from dictionary.utils import CacheFormat, cache_to_file
 from pydantic import TypeAdapter
 
 
-@cache_to_file(accentless_cache_path, TypeAdapter(dict[str, list[str]]))
+@cache_to_file(
+    accentless_cache_path,
+    TypeAdapter(dict[str, list[str]]),
+    inputs=[db_path],
+    cache_format=CacheFormat.BINARY,
+)
 def create_accentless_form_to_lemmas_mapping() -> dict[str, list[str]]:
     """Create a mapping from accentless words to their lemmas.
 
     Reads from the SQLite database and creates a dictionary mapping accentless
-    word forms to their lemmas. The result is cached to io/accentless.json
+    word forms to their lemmas. The result is cached to io/output/accentless.bin
     for faster subsequent loads.
 
     Returns:
         Dictionary mapping accentless word -> list of lemmas
     """
     accentless_map: dict[str, set[str]] = {}
-    if not db_path.exists():
-        raise FileNotFoundError(f"Database not found at {db_path}")
-    db_uri = f"file:{db_path}?mode=ro"
-    with sqlite3.connect(db_uri, uri=True) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT form, lemma FROM words")
-        for form, lemma in cursor.fetchall():
-            if len(form.split()) > 1:
-                continue
-            if len(lemma.split()) > 1:
-                continue
-            accentless_form = drop_greek_accents(form)
-            if accentless_form in forms_to_exclude:
-                continue
-            if accentless_form not in accentless_map:
-                accentless_map[accentless_form] = set()
-            accentless_map[accentless_form].add(lemma)
+    cursor = get_connection().execute(FORM_LEMMA_PAIRS_QUERY)
+    for form, lemma in cursor:
+        if len(form.split()) > 1:
+            continue
+        if len(lemma.split()) > 1:
+            continue
+        accentless_form = drop_greek_accents(form)
+        if accentless_form in forms_to_exclude:
+            continue
+        if accentless_form not in accentless_map:
+            accentless_map[accentless_form] = set()
+        accentless_map[accentless_form].add(lemma)
     result = {k: list(sorted(v)) for k, v in accentless_map.items()}
     return result
 
@@ -48,20 +50,57 @@ def drop_greek_accents(word: str) -> str:
     Returns:
         Word with all accents removed
     """
-    result = []
-    for char in word:
-        if char in GREEK_ACCENT_MAP:
-            result.append(GREEK_ACCENT_MAP[char])
-        else:
-            # Use Unicode normalization to decompose characters
-            # NFD (Normalization Form Decomposed) separates base characters from diacritics
-            normalized = unicodedata.normalize("NFD", char)
-            # Filter out combining diacritical marks (category starts with 'M' for Mark)
-            base_char = "".join(
-                c for c in normalized if unicodedata.category(c) != "Mn"
-            )
-            result.append(base_char if base_char else char)
-    return "".join(result)
+    if word.isascii() or not _needs_translation.search(word):
+        return word
+    return word.translate(_accent_table)
+
+
+def drop_greek_accents_batch(words: Iterable[str]) -> list[str]:
+    """Apply drop_greek_accents to many words.
+
+    Args:
+        words: Greek words with possible accents
+
+    Returns:
+        Words with all accents removed, in the same order
+    """
+    return list(map(drop_greek_accents, words))
+
+
+def _drop_char_accents(char: str) -> str:
+    """Reference per-character implementation the translate table is built from."""
+    if char in GREEK_ACCENT_MAP:
+        return GREEK_ACCENT_MAP[char]
+    # Use Unicode normalization to decompose characters
+    # NFD (Normalization Form Decomposed) separates base characters from diacritics
+    normalized = unicodedata.normalize("NFD", char)
+    # Filter out combining diacritical marks (category starts with 'M' for Mark)
+    base_char = "".join(c for c in normalized if unicodedata.category(c) != "Mn")
+    return base_char if base_char else char
+
+
+def _drop_greek_accents_reference(word: str) -> str:
+    """Character-by-character drop_greek_accents, used to check the fast version."""
+    return "".join(_drop_char_accents(char) for char in word)
+
+
+class _AccentTable(dict):
+    """str.translate table: code point -> unaccented string.
+
+    Greek and Coptic and Greek Extended are precomputed; other characters are
+    computed on first use and cached while the table holds fewer than
+    _ACCENT_TABLE_MAX_SIZE code points.
+    """
+
+    def __missing__(self, code: int) -> str:
+        value = _drop_char_accents(chr(code))
+        if len(self) < _ACCENT_TABLE_MAX_SIZE:
+            self[code] = value
+        return value
+
+
+# Precomputed Greek blocks (400 code points) plus cached other characters
+_ACCENT_TABLE_MAX_SIZE = 4096
 
 
 # Mapping of accented Greek characters to their unaccented equivalents
@@ -121,6 +160,22 @@ GREEK_ACCENT_MAP = {
     "ῼ": "Ω",
 }
 
+_greek_blocks = [*range(0x0370, 0x0400), *range(0x1F00, 0x2000)]
+_accent_table = _AccentTable(
+    {code: _drop_char_accents(chr(code)) for code in _greek_blocks}
+)
+# Matches any character drop_greek_accents may change: everything but ASCII
+# and Greek characters without diacritics.
+_needs_translation = re.compile(
+    "[^\\x00-\\x7f"
+    + "".join(
+        re.escape(chr(code))
+        for code in _greek_blocks
+        if _accent_table[code] == chr(code)
+    )
+    + "]"
+)
+
 forms_to_exclude = {
     "ο",
     "του",
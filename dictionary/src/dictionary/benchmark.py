@@ -0,0 +1,233 @@
+"""Benchmarks of every pipeline stage on synthetic inputs of growing size.
+
+For each scale, synthetic inputs are generated (see `dictionary.synthetic`)
+and measured in fresh worker processes with DICTIONARY_IO_DIR pointing at
+them, twice:
+
+- cold: io/output is empty, so every stage builds and writes its cache;
+- warm: the caches of the cold run are checked and loaded.
+
+A worker times the stages of `pipeline.STAGES` in order, so each time
+excludes its upstream stages, then takes the best of `repeat` runs of
+drop_greek_accents over every dict.db form, word_record_from_record (what
+the words stages call) over every words row, parse_bilingual_sentence_file
+over sentence-pairs.txt and the streamed serialization of the dictionary with
+its compressed copies. word_from_record, which builds a pydantic Word per row,
+is timed over the same rows for comparison.
+
+Run `python -m dictionary.benchmark`; results are written as JSON.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from dictionary.config import (
+    artifact_codecs,
+    benchmark_directory,
+    sentence_pairs_source_path,
+)
+
+DEFAULT_SCALES = (1, 10, 100)
+MODES = ("cold", "warm")
+
+
+def run_benchmarks(
+    scales: tuple[int, ...] = DEFAULT_SCALES,
+    work_dir: Path = benchmark_directory,
+    repeat: int = 3,
+) -> dict:
+    """Generate inputs for every scale and measure them cold, then warm.
+
+    Returns:
+        {"python", "repeat", "scales": {scale: {"inputs", "cold", "warm"}}}
+        where each mode holds stage and function timings in seconds
+    """
+    from dictionary.synthetic import generate_synthetic_io
+
+    results = {
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "scales": {},
+    }
+    for scale in scales:
+        io_dir = work_dir / f"scale-{scale}"
+        generate_synthetic_io(io_dir, scale)
+        shutil.rmtree(io_dir / "output", ignore_errors=True)
+        cold = _run_worker(io_dir, repeat)
+        # Same inputs, now with the caches the cold run wrote
+        warm = _run_worker(io_dir, repeat)
+        results["scales"][str(scale)] = {
+            "inputs": _input_sizes(io_dir),
+            "cold": cold,
+            "warm": warm,
+        }
+    return results
+
+
+def measure(repeat: int) -> dict:
+    """Time the stages and functions on the inputs of this process's config.
+
+    Returns:
+        {"stages": {name: seconds}, "functions": {name: seconds}, "outputs": {...}}
+    """
+    from dictionary.accentless import drop_greek_accents
+    from dictionary.db import WORD_COLUMNS, get_connection
+    from dictionary.dictionary import create_dictionary
+    from dictionary.orm import word_from_record, word_record_from_record
+    from dictionary.pipeline import STAGES
+    from dictionary.sentence_phrases import parse_bilingual_sentence_file
+    from dictionary.utils import write_json_artifact
+
+    stages = {}
+    for name, (stage, _) in STAGES.items():
+        start = time.perf_counter()
+        stage()
+        stages[name] = time.perf_counter() - start
+
+    query = (
+        f"SELECT {', '.join(WORD_COLUMNS)} FROM words"
+        " WHERE pos IS NOT NULL AND pos != ''"
+    )
+    records = [dict(zip(WORD_COLUMNS, row)) for row in get_connection().execute(query)]
+    forms = [record["form"] for record in records]
+    sentence_text = sentence_pairs_source_path.read_text(encoding="utf-8")
+    dictionary = create_dictionary()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serialized_path = Path(tmp) / "dictionary.json"
+        functions = {
+            "drop_greek_accents": _best_of(
+                repeat, lambda: [drop_greek_accents(form) for form in forms]
+            ),
+            "word_record_from_record": _best_of(
+                repeat, lambda: [word_record_from_record(record) for record in records]
+            ),
+            # Pydantic path the words stages used before WordRecord, for comparison
+            "word_from_record (comparison)": _best_of(
+                repeat, lambda: [word_from_record(record) for record in records]
+            ),
+            "parse_bilingual_sentence_file": _best_of(
+                repeat, lambda: parse_bilingual_sentence_file(sentence_text)
+            ),
+            "serialize_dictionary": _best_of(
+                repeat,
+                lambda: write_json_artifact(
+                    serialized_path, dictionary, artifact_codecs
+                ),
+            ),
+        }
+        serialized_size = serialized_path.stat().st_size
+
+    return {
+        "stages": stages,
+        "functions": functions,
+        "outputs": {
+            "words": len(dictionary.words),
+            "lemmas": len(dictionary.lemmas),
+            "word_cards": len(dictionary.word_cards),
+            "dictionary_json_bytes": serialized_size,
+        },
+    }
+
+
+def print_results(results: dict) -> None:
+    """Print stage and function times per scale and mode as a table."""
+    columns = [(scale, mode) for scale in results["scales"] for mode in MODES]
+    names = {
+        (kind, name): None
+        for scale_results in results["scales"].values()
+        for mode in MODES
+        for kind in ("stages", "functions")
+        for name in scale_results[mode][kind]
+    }
+    header = "".join(f" {f'{scale}x {mode}':>11}" for scale, mode in columns)
+    print(f"{'seconds':<30}{header}")
+    for kind, name in names:
+        times = [
+            results["scales"][scale][mode][kind].get(name, float("nan"))
+            for scale, mode in columns
+        ]
+        row = "".join(f" {seconds:11.3f}" for seconds in times)
+        print(f"{name:<30}{row}")
+
+
+def _run_worker(io_dir: Path, repeat: int) -> dict:
+    """measure() in a fresh interpreter whose config points at io_dir."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = Path(tmp) / "result.json"
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "dictionary.benchmark",
+                "--worker",
+                str(result_path),
+                "--repeat",
+                str(repeat),
+            ],
+            env={**os.environ, "DICTIONARY_IO_DIR": str(io_dir)},
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+def _input_sizes(io_dir: Path) -> dict[str, int]:
+    """Byte sizes of the generated inputs."""
+    paths = [io_dir / "dict.db", *sorted((io_dir / "phrases").iterdir())]
+    return {path.name: path.stat().st_size for path in paths}
+
+
+def _best_of(repeat: int, func: Callable[[], object]) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline stages on synthetic inputs"
+    )
+    parser.add_argument(
+        "-s",
+        "--scale",
+        type=int,
+        action="append",
+        dest="scales",
+        help="Input scale, repeatable (default: %s)"
+        % ", ".join(map(str, DEFAULT_SCALES)),
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=benchmark_directory / "results.json",
+        help="Results JSON file",
+    )
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Measure this process's inputs (DICTIONARY_IO_DIR) into the given file
+        result = measure(args.repeat)
+        args.worker.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    else:
+        scales = tuple(args.scales or DEFAULT_SCALES)
+        results = run_benchmarks(scales, repeat=args.repeat)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print_results(results)
+        print(f"\nResults written to {args.output}")
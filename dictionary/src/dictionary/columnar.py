@@ -0,0 +1,265 @@
+"""Columnar, index-coded encoding of Dictionary.
+
+Every entry list becomes a set of parallel int columns. Strings (forms,
+lemmas, tags, translations, phrases) are stored once in a shared string
+table and referenced by index. Enum fields are small int codes into a shared
+enum table whose entry 0 is null. Variable-length lists are stored flat with
+an offsets column of length n + 1 (entry i spans offsets[i]:offsets[i + 1]).
+-1 encodes None in int and string-index columns.
+"""
+
+from pydantic import BaseModel
+
+from dictionary.config import artifact_codecs, columnar_dictionary_cache_path
+from dictionary.data_types import (
+    Dictionary,
+    Lemma,
+    Phrase,
+    Translation,
+    Word,
+    WordCard,
+)
+from dictionary.dictionary import create_dictionary
+from dictionary.orm import WORD_ENUM_FIELDS
+from dictionary.utils import CacheFormat, cache_to_file
+
+COLUMNAR_FORMAT = "lexico-columnar"
+COLUMNAR_VERSION = 1
+
+# Enum tables: field -> [None, member values...]; a code indexes this list.
+ENUM_TABLES: dict[str, list[str | None]] = {
+    name: [None, *(member.value for member in enum_type)]
+    for name, _, enum_type in WORD_ENUM_FIELDS
+}
+
+
+class ColumnarDictionary(BaseModel):
+    format: str = COLUMNAR_FORMAT
+    version: int = COLUMNAR_VERSION
+    strings: list[str]
+    enums: dict[str, list[str | None]]
+    words: dict[str, list[int]]
+    lemmas: dict[str, list[int]]
+    word_cards: dict[str, list[int]]
+    pos_lemma_index: dict[str, list[int]]
+
+
+@cache_to_file(
+    columnar_dictionary_cache_path,
+    ColumnarDictionary,
+    cache_format=CacheFormat.COMPACT_JSON,
+    codecs=artifact_codecs,
+)
+def create_columnar_dictionary() -> ColumnarDictionary:
+    """Creates the columnar encoding of create_dictionary().
+
+    Cached to io/output/dictionary.columnar.json
+    """
+    return encode_columnar(create_dictionary())
+
+
+def encode_columnar(dictionary: Dictionary) -> ColumnarDictionary:
+    """Encode a Dictionary into columns; see the module docstring for the layout."""
+    strings = _StringTable()
+    enum_codes = {
+        name: {value: code for code, value in enumerate(table)}
+        for name, table in ENUM_TABLES.items()
+    }
+
+    words: dict[str, list[int]] = {
+        column: []
+        for column in ("form", "lemma", "lemma_index", "frequency_rank", "tags")
+    }
+    words.update({name: [] for name in ENUM_TABLES})
+    for word in dictionary.words:
+        words["form"].append(strings.index(word.form))
+        words["lemma"].append(strings.index(word.lemma))
+        words["lemma_index"].append(word.lemma_index)
+        words["frequency_rank"].append(_int_or_missing(word.frequency_rank))
+        words["tags"].append(strings.index_or_missing(word.tags))
+        for name, codes in enum_codes.items():
+            member = getattr(word, name)
+            words[name].append(codes[member.value if member is not None else None])
+
+    lemmas = _columns(
+        "lemma",
+        "pos_en",
+        "frequency_rank",
+        "has_translation",
+        "en_offsets",
+        "en",
+        "ru_offsets",
+        "ru",
+        "word_offsets",
+        "word_indices",
+    )
+    for name in ("en_offsets", "ru_offsets", "word_offsets"):
+        lemmas[name].append(0)
+    for lemma in dictionary.lemmas:
+        translation = lemma.translation or Translation()
+        lemmas["lemma"].append(strings.index(lemma.lemma))
+        lemmas["pos_en"].append(enum_codes["pos_en"][lemma.pos_en.value])
+        lemmas["frequency_rank"].append(_int_or_missing(lemma.frequency_rank))
+        lemmas["has_translation"].append(int(lemma.translation is not None))
+        _append_list(lemmas, "en", [strings.index(s) for s in translation.en])
+        _append_list(lemmas, "ru", [strings.index(s) for s in translation.ru])
+        _append_list(lemmas, "word", lemma.word_indices, values="word_indices")
+
+    word_cards = _columns(
+        "form",
+        "phrase_offsets",
+        "phrase_greek",
+        "phrase_english",
+        "word_offsets",
+        "word_indices",
+        "lemma_offsets",
+        "lemma_indices",
+    )
+    for name in ("phrase_offsets", "word_offsets", "lemma_offsets"):
+        word_cards[name].append(0)
+    for card in dictionary.word_cards:
+        word_cards["form"].append(strings.index(card.form))
+        word_cards["phrase_greek"].extend(strings.index(p.greek) for p in card.phrases)
+        word_cards["phrase_english"].extend(
+            strings.index(p.english) for p in card.phrases
+        )
+        word_cards["phrase_offsets"].append(len(word_cards["phrase_greek"]))
+        _append_list(word_cards, "word", card.word_indices, values="word_indices")
+        _append_list(word_cards, "lemma", card.lemma_indices, values="lemma_indices")
+
+    return ColumnarDictionary(
+        strings=strings.strings,
+        enums=ENUM_TABLES,
+        words=words,
+        lemmas=lemmas,
+        word_cards=word_cards,
+        pos_lemma_index={
+            pos.value: indices for pos, indices in dictionary.pos_lemma_index.items()
+        },
+    )
+
+
+def decode_columnar(columnar: ColumnarDictionary) -> Dictionary:
+    """Inverse of encode_columnar.
+
+    Raises:
+        ValueError: If the data is not a supported columnar format version
+    """
+    if columnar.format != COLUMNAR_FORMAT or columnar.version != COLUMNAR_VERSION:
+        raise ValueError(
+            f"Unsupported dictionary format {columnar.format!r} v{columnar.version}"
+        )
+    strings = columnar.strings
+    enums = columnar.enums
+
+    def string_or_none(i: int) -> str | None:
+        return strings[i] if i != -1 else None
+
+    words_columns = columnar.words
+    words = [
+        Word(
+            form=strings[words_columns["form"][i]],
+            lemma=strings[words_columns["lemma"][i]],
+            lemma_index=words_columns["lemma_index"][i],
+            frequency_rank=_int_or_none(words_columns["frequency_rank"][i]),
+            tags=string_or_none(words_columns["tags"][i]),
+            **{name: enums[name][words_columns[name][i]] for name in ENUM_TABLES},
+        )
+        for i in range(len(words_columns["form"]))
+    ]
+
+    lemmas_columns = columnar.lemmas
+    lemmas = []
+    for i in range(len(lemmas_columns["lemma"])):
+        translation = None
+        if lemmas_columns["has_translation"][i]:
+            translation = Translation(
+                en=[strings[s] for s in _list_at(lemmas_columns, "en", i)],
+                ru=[strings[s] for s in _list_at(lemmas_columns, "ru", i)],
+            )
+        lemmas.append(
+            Lemma(
+                lemma=strings[lemmas_columns["lemma"][i]],
+                pos_en=enums["pos_en"][lemmas_columns["pos_en"][i]],
+                frequency_rank=_int_or_none(lemmas_columns["frequency_rank"][i]),
+                translation=translation,
+                word_indices=_list_at(lemmas_columns, "word", i, "word_indices"),
+            )
+        )
+
+    cards_columns = columnar.word_cards
+    word_cards = []
+    for i in range(len(cards_columns["form"])):
+        start, end = cards_columns["phrase_offsets"][i : i + 2]
+        phrases = [
+            Phrase(
+                greek=strings[cards_columns["phrase_greek"][j]],
+                english=strings[cards_columns["phrase_english"][j]],
+            )
+            for j in range(start, end)
+        ]
+        word_cards.append(
+            WordCard(
+                form=strings[cards_columns["form"][i]],
+                phrases=phrases,
+                word_indices=_list_at(cards_columns, "word", i, "word_indices"),
+                lemma_indices=_list_at(cards_columns, "lemma", i, "lemma_indices"),
+            )
+        )
+
+    return Dictionary(
+        lemmas=lemmas,
+        words=words,
+        pos_lemma_index=columnar.pos_lemma_index,
+        word_cards=word_cards,
+    )
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: list[str] = []
+        self._indices: dict[str, int] = {}
+
+    def index(self, s: str) -> int:
+        i = self._indices.get(s)
+        if i is None:
+            i = self._indices[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def index_or_missing(self, s: str | None) -> int:
+        return self.index(s) if s is not None else -1
+
+
+def _columns(*names: str) -> dict[str, list[int]]:
+    return {name: [] for name in names}
+
+
+def _append_list(
+    columns: dict[str, list[int]],
+    prefix: str,
+    items: list[int],
+    values: str | None = None,
+) -> None:
+    values = values or prefix
+    columns[values].extend(items)
+    columns[f"{prefix}_offsets"].append(len(columns[values]))
+
+
+def _list_at(
+    columns: dict[str, list[int]], prefix: str, i: int, values: str | None = None
+) -> list[int]:
+    start, end = columns[f"{prefix}_offsets"][i : i + 2]
+    return columns[values or prefix][start:end]
+
+
+def _int_or_missing(value: int | None) -> int:
+    return value if value is not None else -1
+
+
+def _int_or_none(value: int) -> int | None:
+    return value if value != -1 else None
+
+
+if __name__ == "__main__":
+    create_columnar_dictionary()
@@ -0,0 +1,322 @@
+"""Pluggable compression for shipped artifacts.
+
+A codec spec is "<codec>" or "<codec>:<level>", e.g. "gzip:9", "zstd:19",
+"brotli:11". gzip is always available; zstd and brotli need the optional
+`zstandard` and `brotli` packages. zstd can use a dictionary trained on
+sample entries (see `train_zstd_dictionary`), which the client then needs to
+decompress.
+
+Run `python -m dictionary.compression` to compare codecs on dictionary.json
+and the sentence phrases payload.
+"""
+
+import argparse
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Codec -> file suffix
+CODEC_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+    "brotli": ".br",
+}
+# Codec -> level used when the spec has none
+DEFAULT_LEVELS = {
+    "gzip": 9,
+    "zstd": 19,
+    "brotli": 11,
+}
+DEFAULT_BENCHMARK_SPECS = (
+    "gzip:1",
+    "gzip:6",
+    "gzip:9",
+    "zstd:3",
+    "zstd:19",
+    "brotli:5",
+    "brotli:11",
+)
+# zstd's recommended dictionary size
+ZSTD_DICTIONARY_SIZE = 112_640
+
+
+def parse_codec(spec: str) -> tuple[str, int]:
+    """"zstd:19" -> ("zstd", 19); "gzip" -> ("gzip", 9).
+
+    Raises:
+        ValueError: If the codec is unknown or the level is not an integer
+    """
+    codec, _, level = spec.partition(":")
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Unknown compression codec {codec!r}")
+    return codec, int(level) if level else DEFAULT_LEVELS[codec]
+
+
+def codec_available(codec: str) -> bool:
+    return (
+        codec == "gzip"
+        or (codec == "zstd" and zstandard is not None)
+        or (codec == "brotli" and brotli is not None)
+    )
+
+
+class _GzipWriter:
+    """GzipFile over a file it owns: closing it closes both."""
+
+    def __init__(self, f: BinaryIO, filename: str, level: int):
+        self._f = f
+        self._gzip = gzip.GzipFile(
+            filename=filename, mode="wb", compresslevel=level, fileobj=f, mtime=0
+        )
+
+    def write(self, data: bytes) -> int:
+        return self._gzip.write(data)
+
+    def close(self) -> None:
+        try:
+            self._gzip.close()
+        finally:
+            self._f.close()
+
+
+class _BrotliWriter:
+    """File-like wrapper around brotli's incremental compressor."""
+
+    def __init__(self, f: BinaryIO, level: int):
+        self._f = f
+        self._compressor = brotli.Compressor(quality=level)
+
+    def write(self, data: bytes) -> int:
+        self._f.write(self._compressor.process(data))
+        return len(data)
+
+    def close(self) -> None:
+        self._f.write(self._compressor.finish())
+        self._f.close()
+
+
+def open_compressor(path: Path, spec: str, zstd_dictionary: bytes | None = None):
+    """Open `path` for writing through the codec. Close the result to finish.
+
+    `path` may be a temporary `<final name>.tmp` file that is renamed later.
+
+    Args:
+        path: Compressed output file
+        spec: Codec spec, e.g. "gzip:9"
+        zstd_dictionary: Trained zstd dictionary; only used by zstd
+
+    Raises:
+        ValueError: If the codec is unknown
+        ImportError: If the codec's optional package is not installed
+    """
+    codec, level = parse_codec(spec)
+    _require(codec)
+    if codec == "gzip":
+        # The header records the file name; leave out a temporary .tmp suffix
+        return _GzipWriter(path.open("wb"), path.name.removesuffix(".tmp"), level)
+    if codec == "zstd":
+        return _zstd_compressor(level, zstd_dictionary).stream_writer(
+            path.open("wb")
+        )
+    return _BrotliWriter(path.open("wb"), level)
+
+
+def compress(data: bytes, spec: str, zstd_dictionary: bytes | None = None) -> bytes:
+    """Compress `data` in one go. Same arguments as `open_compressor`."""
+    codec, level = parse_codec(spec)
+    _require(codec)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == "zstd":
+        return _zstd_compressor(level, zstd_dictionary).compress(data)
+    return brotli.compress(data, quality=level)
+
+
+def decompress(data: bytes, spec: str, zstd_dictionary: bytes | None = None) -> bytes:
+    codec, _ = parse_codec(spec)
+    _require(codec)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        dict_data = (
+            zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary else None
+        )
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    return brotli.decompress(data)
+
+
+def compressed_path(path: Path, spec: str) -> Path:
+    """dictionary.json -> dictionary.json.gz etc."""
+    codec, _ = parse_codec(spec)
+    return path.with_name(path.name + CODEC_SUFFIXES[codec])
+
+
+def train_zstd_dictionary(
+    samples: Iterable[bytes], size: int = ZSTD_DICTIONARY_SIZE
+) -> bytes:
+    """Train a zstd dictionary on sample entries, e.g. serialized words.
+
+    Raises:
+        ImportError: If zstandard is not installed
+    """
+    _require("zstd")
+    return zstandard.train_dictionary(size, list(samples)).as_bytes()
+
+
+def json_samples(payload: bytes) -> list[bytes]:
+    """Elements of a top-level JSON list, or of every list value of a top-level
+    JSON object, serialized compactly.
+
+    These are the repeated entries (words, lemmas, word cards, phrases) a zstd
+    dictionary is trained on.
+
+    Raises:
+        ValueError: If the payload is neither a JSON object nor a list
+    """
+    data = json.loads(payload)
+    if isinstance(data, list):
+        lists = [data]
+    elif isinstance(data, dict):
+        lists = [value for value in data.values() if isinstance(value, list)]
+    else:
+        raise ValueError("JSON samples need a top-level object or list")
+    return [
+        json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode()
+        for items in lists
+        for item in items
+    ]
+
+
+def benchmark(
+    payload: bytes,
+    specs: Iterable[str] = DEFAULT_BENCHMARK_SPECS,
+    repeat: int = 3,
+    zstd_dictionary: bytes | None = None,
+) -> list[dict]:
+    """Compressed size and best-of-`repeat` compress/decompress times per codec.
+
+    Codecs whose package is not installed are skipped. With a zstd
+    dictionary, every zstd spec is also measured with it ("zstd:19+dict").
+
+    Returns:
+        One row per measured spec: spec, size, ratio, compress_ms, decompress_ms
+    """
+    runs: list[tuple[str, str, bytes | None]] = []
+    for spec in specs:
+        codec, _ = parse_codec(spec)
+        if not codec_available(codec):
+            continue
+        runs.append((spec, spec, None))
+        if codec == "zstd" and zstd_dictionary is not None:
+            runs.append((spec + "+dict", spec, zstd_dictionary))
+
+    rows = []
+    for label, spec, dictionary in runs:
+        compress_times, decompress_times = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            compressed = compress(payload, spec, dictionary)
+            compress_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            restored = decompress(compressed, spec, dictionary)
+            decompress_times.append(time.perf_counter() - start)
+        if restored != payload:
+            raise RuntimeError(f"{label} did not round-trip")
+        rows.append(
+            {
+                "spec": label,
+                "size": len(compressed),
+                "ratio": len(compressed) / len(payload) if payload else 0.0,
+                "compress_ms": min(compress_times) * 1000,
+                "decompress_ms": min(decompress_times) * 1000,
+            }
+        )
+    return rows
+
+
+def _zstd_compressor(level: int, zstd_dictionary: bytes | None):
+    dict_data = (
+        zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary else None
+    )
+    return zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+
+
+def _require(codec: str) -> None:
+    if not codec_available(codec):
+        package = "zstandard" if codec == "zstd" else codec
+        raise ImportError(f"{codec} compression requires the {package} package")
+
+
+def _default_payloads() -> dict[str, bytes]:
+    from dictionary.config import dictionary_cache_path
+    from dictionary.sentence_phrases import sentence_phrases_payload
+
+    payloads = {"phrases": sentence_phrases_payload()}
+    if dictionary_cache_path.exists():
+        payloads[dictionary_cache_path.name] = dictionary_cache_path.read_bytes()
+    return payloads
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare compression codecs on the shipped artifacts"
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        type=Path,
+        help="JSON files to compress (default: dictionary.json and phrases payload)",
+    )
+    parser.add_argument(
+        "-c",
+        "--codec",
+        action="append",
+        dest="specs",
+        help="Codec spec, repeatable (default: %s)"
+        % ", ".join(DEFAULT_BENCHMARK_SPECS),
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-zstd-dict",
+        action="store_true",
+        help="Do not measure zstd with a dictionary trained on the payload entries",
+    )
+    args = parser.parse_args()
+
+    specs = args.specs or DEFAULT_BENCHMARK_SPECS
+    payloads = (
+        {path.name: path.read_bytes() for path in args.files}
+        if args.files
+        else _default_payloads()
+    )
+    for codec in CODEC_SUFFIXES:
+        if not codec_available(codec):
+            print(f"({codec} not installed, skipped)")
+    for name, payload in payloads.items():
+        dictionary = None
+        if zstandard is not None and not args.no_zstd_dict:
+            dictionary = train_zstd_dictionary(json_samples(payload))
+        print(f"\n{name}: {len(payload)} bytes")
+        if dictionary is not None:
+            print(f"  trained zstd dictionary: {len(dictionary)} bytes")
+        print(
+            f"  {'codec':<16} {'size':>10} {'ratio':>7}"
+            f" {'comp ms':>9} {'decomp ms':>9}"
+        )
+        for row in benchmark(payload, specs, args.repeat, dictionary):
+            print(
+                f"  {row['spec']:<16} {row['size']:>10} {row['ratio']:>7.3f}"
+                f" {row['compress_ms']:>9.2f} {row['decompress_ms']:>9.2f}"
+            )
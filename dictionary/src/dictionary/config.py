@@ -1,7 +1,9 @@
+import os
 import pathlib
 
 base_dir = pathlib.Path(__file__).parent.parent.parent
-io_dir = base_dir / "io"
+# DICTIONARY_IO_DIR points the whole pipeline at other inputs, e.g. synthetic ones
+io_dir = pathlib.Path(os.environ.get("DICTIONARY_IO_DIR", base_dir / "io"))
 db_path = io_dir / "dict.db"
 output_directory = io_dir / "output"
 
@@ -12,14 +14,35 @@ greek_50k_path = phrases_dir / "greek-50k.txt"
 # Bilingual sentence pairs (Greek line, English line, blank line between entries)
 sentence_pairs_source_path = phrases_dir / "sentence-pairs.txt"
 
-# Cache file paths
-enriched_words_cache_path = output_directory / "enriched_words.json"
-slim_words_cache_path = output_directory / "slim_words.json"
-phrases_cache_path = output_directory / "phrases.json"
-word_ranking_cache_path = output_directory / "word_ranking.json"
-lemma_ranking_cache_path = output_directory / "lemma_ranking.json"
-lemmas_cache_path = output_directory / "lemmas.json"
-accentless_cache_path = output_directory / "accentless.json"
-translations_cache_path = output_directory / "translations.json"
+# Cache file paths (intermediate stages use the binary cache format)
+enriched_words_cache_path = output_directory / "enriched_words.bin"
+slim_words_cache_path = output_directory / "slim_words.bin"
+phrases_cache_path = output_directory / "phrases.bin"
+word_ranking_cache_path = output_directory / "word_ranking.bin"
+lemma_ranking_cache_path = output_directory / "lemma_ranking.bin"
+lemmas_cache_path = output_directory / "lemmas.bin"
+accentless_cache_path = output_directory / "accentless.bin"
+translations_cache_path = output_directory / "translations.bin"
 dictionary_cache_path = output_directory / "dictionary.json"
-word_cards_cache_path = output_directory / "word_cards.json"
+word_cards_cache_path = output_directory / "word_cards.bin"
+columnar_dictionary_cache_path = output_directory / "dictionary.columnar.json"
+phrase_index_cache_path = output_directory / "phrase_index.bin"
+prefix_index_cache_path = output_directory / "prefix_index.json"
+fuzzy_index_cache_path = output_directory / "fuzzy_index.json"
+reverse_translations_cache_path = output_directory / "reverse_translations.json"
+# Example phrases per word card: the curated phrase, then the best indexed ones
+phrases_per_card = 3
+# Compressed copies written alongside the shipped JSON artifacts
+artifact_codecs = ("gzip",)
+# Synthetic inputs and results of python -m dictionary.benchmark
+benchmark_directory = io_dir / "benchmark"
+
+
+def incremental_build() -> bool:
+    """Whether stages patch their previous output when only phrases changed.
+
+    Keeps existing word, lemma and word card indices stable; new entries are
+    appended. Enabled with DICTIONARY_INCREMENTAL=1. The keys of those stages
+    record the mode, so a full build never reuses a patched output.
+    """
+    return os.environ.get("DICTIONARY_INCREMENTAL", "") == "1"
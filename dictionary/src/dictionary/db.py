@@ -0,0 +1,98 @@
+import json
+import sqlite3
+from typing import Iterable, Iterator
+
+from dictionary.config import db_path
+
+# Columns of the words table used by word_from_record.
+WORD_COLUMNS = (
+    "form",
+    "lemma",
+    "pos",
+    "greek_pos",
+    "gender",
+    "ptosi",
+    "number",
+    "degree",
+    "person",
+    "tense",
+    "aspect",
+    "mood",
+    "verbform",
+    "voice",
+    "tags",
+)
+
+_word_columns_sql = ", ".join(f"w.{column}" for column in WORD_COLUMNS)
+
+# Lookup keys are passed as one JSON array and joined through json_each,
+# which needs no writes (query_only forbids even temp tables).
+WORDS_BY_FORMS_QUERY = f"""
+    SELECT {_word_columns_sql}
+    FROM json_each(?) AS keys
+    JOIN words AS w ON w.form = keys.value
+    WHERE w.pos IS NOT NULL AND w.pos != ''
+"""
+
+WORDS_BY_LEMMAS_QUERY = f"""
+    SELECT {_word_columns_sql}
+    FROM json_each(?) AS keys
+    JOIN words AS w ON w.lemma = keys.value
+    WHERE w.pos IS NOT NULL AND w.pos != ''
+"""
+
+FORM_LEMMA_PAIRS_QUERY = "SELECT DISTINCT form, lemma FROM words"
+
+TRANSLATIONS_QUERY = """
+    SELECT src_lemma, dest, dest_lemma
+    FROM translations
+    WHERE src = 'el' AND dest IN ('en', 'ru')
+    ORDER BY src_lemma, dest, dest_lemma
+"""
+
+_connection: sqlite3.Connection | None = None
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return the read-only connection to dict.db shared by the whole run.
+
+    The database is memory-mapped and given a large page cache, since every
+    extraction stage reads from it.
+    """
+    global _connection
+    if _connection is None:
+        if not db_path.exists():
+            raise FileNotFoundError(f"Database not found at {db_path}")
+        db_uri = f"file:{db_path}?mode=ro"
+        conn = sqlite3.connect(db_uri, uri=True)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute("PRAGMA mmap_size = 1073741824")  # 1 GiB
+        conn.execute("PRAGMA cache_size = -262144")  # 256 MiB
+        conn.execute("PRAGMA temp_store = MEMORY")
+        _connection = conn
+    return _connection
+
+
+def close_connection() -> None:
+    """Close the shared connection; the next get_connection() reopens it."""
+    global _connection
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+
+
+def query_word_records_by_forms(forms: Iterable[str]) -> Iterator[dict]:
+    """Yield word records (WORD_COLUMNS -> value) for the given forms, in one query."""
+    return _query_word_records(WORDS_BY_FORMS_QUERY, forms)
+
+
+def query_word_records_by_lemmas(lemmas: Iterable[str]) -> Iterator[dict]:
+    """Yield word records (WORD_COLUMNS -> value) for the given lemmas, in one query."""
+    return _query_word_records(WORDS_BY_LEMMAS_QUERY, lemmas)
+
+
+def _query_word_records(query: str, keys: Iterable[str]) -> Iterator[dict]:
+    keys_json = json.dumps(list(keys), ensure_ascii=False)
+    cursor = get_connection().execute(query, (keys_json,))
+    for row in cursor:
+        yield dict(zip(WORD_COLUMNS, row))
@@ -0,0 +1,154 @@
+"""Exact and near-duplicate phrase removal.
+
+Phrases are compared by their normalized Greek side: accents dropped with
+drop_greek_accents, case-folded, punctuation removed. Exact duplicates are
+found with a set of 64-bit hashes of normalized texts. Near duplicates (e.g.
+differing in one character or word) are found with MinHash over character
+shingles and LSH banding: a phrase is only compared with the first kept phrase
+of each of its band buckets, so the whole pass is linear in the number of
+phrases. Per kept phrase, the state is one hash, one packed signature and an
+int key per band, not the phrase itself.
+"""
+
+import hashlib
+import re
+import zlib
+from array import array
+from typing import Iterable, Iterator
+
+from dictionary.accentless import drop_greek_accents
+
+# Characters per shingle
+SHINGLE_SIZE = 4
+# MinHash signature length = LSH_BANDS * LSH_ROWS; a power of two
+LSH_BANDS = 8
+LSH_ROWS = 4
+# Estimated Jaccard similarity at which a phrase counts as a near duplicate
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_WORDS = re.compile(r"\w+")
+_SIGNATURE_LENGTH = LSH_BANDS * LSH_ROWS
+# The top bits of a 32-bit shingle hash pick its bin, the rest is its value
+_BIN_SHIFT = 32 - (_SIGNATURE_LENGTH.bit_length() - 1)
+_VALUE_MASK = (1 << _BIN_SHIFT) - 1
+_EMPTY = 1 << _BIN_SHIFT
+
+
+def normalize_phrase(text: str) -> str:
+    """Accentless, case-folded words of `text`, separated by single spaces."""
+    return " ".join(_WORDS.findall(drop_greek_accents(text).casefold()))
+
+
+def minhash_signature(text: str) -> tuple[int, ...]:
+    """MinHash signature of the character shingles of a normalized text.
+
+    One-permutation MinHash: every shingle is hashed once into one of the
+    signature's bins, which keep their minimum value. Empty bins borrow the
+    value of the next non-empty bin (densification), so similar texts still
+    agree on them. Costs O(shingles) instead of O(shingles * bins).
+    """
+    signature = [_EMPTY] * _SIGNATURE_LENGTH
+    for i in range(max(1, len(text) - SHINGLE_SIZE + 1)):
+        h = zlib.crc32(text[i : i + SHINGLE_SIZE].encode("utf-8"))
+        value = h & _VALUE_MASK
+        if value < signature[h >> _BIN_SHIFT]:
+            signature[h >> _BIN_SHIFT] = value
+    for i, value in enumerate(signature):
+        if value == _EMPTY:
+            for step in range(1, _SIGNATURE_LENGTH):
+                other = signature[(i + step) % _SIGNATURE_LENGTH]
+                if other < _EMPTY:
+                    # Offset by the distance, so borrowed values stay distinct
+                    signature[i] = _EMPTY + step * _EMPTY + other
+                    break
+    return tuple(signature)
+
+
+def _similarity(a: tuple[int, ...], b: bytes) -> float:
+    """Share of equal MinHash values, an estimate of the Jaccard similarity.
+
+    `b` is a signature packed with _pack_signature.
+    """
+    return sum(x == y for x, y in zip(a, memoryview(b).cast("Q"))) / len(a)
+
+
+def _pack_signature(signature: tuple[int, ...]) -> bytes:
+    return array("Q", signature).tobytes()
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class PhraseDeduplicator:
+    """Streaming filter that keeps the first of duplicate or near-duplicate phrases.
+
+    Counts what it dropped in `exact_duplicates` and `near_duplicates`.
+
+    Args:
+        near_threshold: Minimum estimated Jaccard similarity of a near
+            duplicate; None only removes exact duplicates
+    """
+
+    def __init__(self, near_threshold: float | None = NEAR_DUPLICATE_THRESHOLD):
+        self.near_threshold = near_threshold
+        self.kept = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        # Hashes of the normalized texts of the kept phrases
+        self._seen: set[int] = set()
+        # Hash of (band index, band values) -> packed signature of the first
+        # kept phrase
+        self._buckets: dict[int, bytes] = {}
+
+    @property
+    def fingerprint(self) -> bytes:
+        """Settings that change which phrases are kept, for artifact hashes."""
+        return (
+            f"dedup:{SHINGLE_SIZE}:{LSH_BANDS}:{LSH_ROWS}:{self.near_threshold}"
+        ).encode()
+
+    def is_duplicate(self, greek: str) -> bool:
+        """Whether the phrase duplicates a kept one; if not, it is kept."""
+        normalized = normalize_phrase(greek)
+        text_hash = _hash64(normalized.encode("utf-8"))
+        if text_hash in self._seen:
+            self.exact_duplicates += 1
+            return True
+        self._seen.add(text_hash)
+        if self.near_threshold is not None:
+            signature = minhash_signature(normalized)
+            packed = _pack_signature(signature)
+            row_bytes = LSH_ROWS * 8
+            keys = [
+                _hash64(
+                    bytes([band]) + packed[band * row_bytes : (band + 1) * row_bytes]
+                )
+                for band in range(LSH_BANDS)
+            ]
+            for key in keys:
+                other = self._buckets.get(key)
+                if other is not None and (
+                    _similarity(signature, other) >= self.near_threshold
+                ):
+                    self.near_duplicates += 1
+                    return True
+            for key in keys:
+                self._buckets.setdefault(key, packed)
+        self.kept += 1
+        return False
+
+    def filter_pairs(
+        self, pairs: Iterable[tuple[str, str]]
+    ) -> Iterator[tuple[str, str]]:
+        """Yield the (greek, english) pairs that are not duplicates."""
+        for pair in pairs:
+            if not self.is_duplicate(pair[0]):
+                yield pair
+
+    def report(self) -> str:
+        total = self.kept + self.exact_duplicates + self.near_duplicates
+        return (
+            f"dedup: kept {self.kept} of {total} phrases, dropped "
+            f"{self.exact_duplicates} exact and {self.near_duplicates} near duplicates"
+        )
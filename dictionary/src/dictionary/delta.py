@@ -0,0 +1,148 @@
+"""Delta artifacts for shipping dictionary updates.
+
+A delta turns the previously published dictionary into the current one:
+each entry list is cut to its new length (dropping removed trailing
+entries), then every listed index is overwritten (changed entries) or
+appended (added entries). Compared index by index, so it is smallest when
+indices are stable (see --incremental in dictionary.pipeline).
+"""
+
+import argparse
+import gzip
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from dictionary.config import dictionary_cache_path, output_directory
+from dictionary.data_types import (
+    Dictionary,
+    Lemma,
+    PartOfSpeechEnglish,
+    Word,
+    WordCard,
+)
+from dictionary.remap import dictionary_hash
+
+DELTA_VERSION = 1
+
+
+class DictionaryDelta(BaseModel):
+    version: int = DELTA_VERSION
+    from_hash: str
+    to_hash: str
+    # Length of each entry list in the new dictionary
+    lengths: dict[str, int]
+    # Index -> entry, for changed and added entries
+    words: dict[int, Word]
+    lemmas: dict[int, Lemma]
+    word_cards: dict[int, WordCard]
+    # Only present if it changed
+    pos_lemma_index: dict[PartOfSpeechEnglish, list[int]] | None = None
+
+
+def create_dictionary_delta(old: Dictionary, new: Dictionary) -> DictionaryDelta:
+    return DictionaryDelta(
+        from_hash=dictionary_hash(old),
+        to_hash=dictionary_hash(new),
+        lengths={
+            "words": len(new.words),
+            "lemmas": len(new.lemmas),
+            "word_cards": len(new.word_cards),
+        },
+        words=_diff_entries(old.words, new.words),
+        lemmas=_diff_entries(old.lemmas, new.lemmas),
+        word_cards=_diff_entries(old.word_cards, new.word_cards),
+        pos_lemma_index=(
+            new.pos_lemma_index
+            if new.pos_lemma_index != old.pos_lemma_index
+            else None
+        ),
+    )
+
+
+def apply_dictionary_delta(old: Dictionary, delta: DictionaryDelta) -> Dictionary:
+    """Apply a delta to the dictionary it was created from.
+
+    Raises:
+        ValueError: If the delta is for another version or dictionary
+    """
+    if delta.version != DELTA_VERSION:
+        raise ValueError(f"Unsupported delta version {delta.version}")
+    if dictionary_hash(old) != delta.from_hash:
+        raise ValueError("Delta does not apply to this dictionary")
+    return Dictionary(
+        words=_patch_entries(old.words, delta.words, delta.lengths["words"]),
+        lemmas=_patch_entries(old.lemmas, delta.lemmas, delta.lengths["lemmas"]),
+        word_cards=_patch_entries(
+            old.word_cards, delta.word_cards, delta.lengths["word_cards"]
+        ),
+        pos_lemma_index=(
+            delta.pos_lemma_index
+            if delta.pos_lemma_index is not None
+            else old.pos_lemma_index
+        ),
+    )
+
+
+def build_dictionary_delta_artifacts(
+    previous_path: Path,
+    current_path: Path | None = None,
+    out_dir: Path | None = None,
+) -> tuple[Path, Path]:
+    """
+    Write dictionary-delta-{from6}-{to6}.json.gz and dictionary-delta-current.txt.
+    Returns (gzip_path, manifest_path).
+    """
+    current_path = current_path or dictionary_cache_path
+    out = out_dir or output_directory
+    out.mkdir(parents=True, exist_ok=True)
+
+    old = Dictionary.model_validate_json(previous_path.read_bytes())
+    new = Dictionary.model_validate_json(current_path.read_bytes())
+    delta = create_dictionary_delta(old, new)
+
+    basename = f"dictionary-delta-{delta.from_hash[:6]}-{delta.to_hash[:6]}.json.gz"
+    gz_path = out / basename
+    manifest_path = out / "dictionary-delta-current.txt"
+    with gzip.GzipFile(filename=str(gz_path), mode="wb", mtime=0) as f:
+        f.write(delta.model_dump_json(exclude_none=True).encode("utf-8"))
+    manifest_path.write_text(basename + "\n", encoding="utf-8")
+    return gz_path, manifest_path
+
+
+def _diff_entries(old: list[BaseModel], new: list[BaseModel]) -> dict[int, BaseModel]:
+    # Word.__eq__ compares identity only, so compare full dumps
+    return {
+        idx: entry
+        for idx, entry in enumerate(new)
+        if idx >= len(old) or old[idx].model_dump() != entry.model_dump()
+    }
+
+
+def _patch_entries(
+    old: list[BaseModel], changed: dict[int, BaseModel], length: int
+) -> list[BaseModel]:
+    entries = old[:length]
+    for idx in sorted(changed):
+        if idx < len(entries):
+            entries[idx] = changed[idx]
+        else:
+            entries.append(changed[idx])
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "previous", type=Path, help="Previously published dictionary.json"
+    )
+    parser.add_argument(
+        "-o",
+        "--out",
+        type=Path,
+        default=None,
+        help="Output directory (default: io/output)",
+    )
+    args = parser.parse_args()
+    gz, manifest = build_dictionary_delta_artifacts(args.previous, out_dir=args.out)
+    print(f"{gz}\n{manifest}")
@@ -1,19 +1,25 @@
 from collections import defaultdict
 
-from dictionary.config import dictionary_cache_path
+from dictionary.config import artifact_codecs, dictionary_cache_path
 from dictionary.data_types import Dictionary, PartOfSpeechEnglish, Word
 from dictionary.lemmas import create_lemmas
-from dictionary.utils import cache_to_file
+from dictionary.utils import CacheFormat, cache_to_file
 from dictionary.words import create_words_stage_2
 from dictionary.word_cards import create_word_cards
 
 
-@cache_to_file(dictionary_cache_path, Dictionary)
+@cache_to_file(
+    dictionary_cache_path,
+    Dictionary,
+    cache_format=CacheFormat.COMPACT_JSON,
+    codecs=artifact_codecs,
+)
 def create_dictionary() -> Dictionary:
     """Creates the Dictionary object
 
     - Enrich Word with lemma index.
-    - Cache output to io/dictionary.json.
+    - Cache output to io/output/dictionary.json, streamed as compact JSON
+      together with its compressed copies and content hash.
     """
     lemmas = create_lemmas()
     words = create_words_stage_2()
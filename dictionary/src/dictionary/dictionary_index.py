@@ -0,0 +1,100 @@
+"""Hash indexes over a built Dictionary for O(1) morphology lookups."""
+
+from dictionary.accentless import drop_greek_accents
+from dictionary.data_types import Dictionary, Lemma, PartOfSpeechEnglish, Word
+from dictionary.orm import WORD_ENUM_FIELDS
+
+# Word fields that tell the inflections of one lemma apart
+ANNOTATION_FIELDS = tuple(name for name, _, _ in WORD_ENUM_FIELDS if name != "pos_en")
+
+
+def word_annotations(word: Word) -> tuple:
+    """Values of ANNOTATION_FIELDS of the word, None where unset."""
+    return tuple(getattr(word, field) for field in ANNOTATION_FIELDS)
+
+
+def accentless_key(form: str) -> str:
+    """Lowercased form without accents, as used by the accentless index."""
+    return drop_greek_accents(form.lower())
+
+
+class DictionaryIndex:
+    """Lookups by form, accentless form, lemma and inflection.
+
+    Word and lemma indices refer to `dictionary.words` and
+    `dictionary.lemmas`. Index lists keep dictionary order (most frequent
+    first).
+
+    Args:
+        dictionary: Built dictionary; must not be modified while indexed
+    """
+
+    __slots__ = (
+        "dictionary",
+        "_form_words",
+        "_accentless_words",
+        "_lemmas",
+        "_inflections",
+    )
+
+    def __init__(self, dictionary: Dictionary):
+        self.dictionary = dictionary
+        self._form_words: dict[str, list[int]] = {}
+        self._accentless_words: dict[str, list[int]] = {}
+        self._lemmas: dict[tuple[str, PartOfSpeechEnglish], int] = {}
+        self._inflections: dict[tuple[int, tuple], int] = {}
+
+        for idx, lemma in enumerate(dictionary.lemmas):
+            self._lemmas.setdefault((lemma.lemma, lemma.pos_en), idx)
+        for idx, word in enumerate(dictionary.words):
+            self._form_words.setdefault(word.form, []).append(idx)
+            accentless = accentless_key(word.form)
+            self._accentless_words.setdefault(accentless, []).append(idx)
+            if word.lemma_index != -1:
+                key = (word.lemma_index, word_annotations(word))
+                self._inflections.setdefault(key, idx)
+
+    def word_indices(self, form: str) -> list[int]:
+        """Indices of the words with exactly this form."""
+        return self._form_words.get(form, [])
+
+    def words(self, form: str) -> list[Word]:
+        return [self.dictionary.words[idx] for idx in self.word_indices(form)]
+
+    def accentless_word_indices(self, form: str) -> list[int]:
+        """Indices of the words matching the form ignoring accents and case."""
+        return self._accentless_words.get(accentless_key(form), [])
+
+    def lemma_index(self, lemma: str, pos_en: PartOfSpeechEnglish) -> int | None:
+        return self._lemmas.get((lemma, pos_en))
+
+    def lemma(self, lemma: str, pos_en: PartOfSpeechEnglish) -> Lemma | None:
+        idx = self.lemma_index(lemma, pos_en)
+        return None if idx is None else self.dictionary.lemmas[idx]
+
+    def inflection_index(self, lemma_index: int, annotations: tuple) -> int | None:
+        """Index of the word of the lemma with exactly these annotations.
+
+        Args:
+            lemma_index: Index into dictionary.lemmas
+            annotations: Values of ANNOTATION_FIELDS, see `word_annotations`
+
+        Returns:
+            The most frequent matching word's index, None if there is none
+        """
+        return self._inflections.get((lemma_index, annotations))
+
+    def inflection(self, lemma_index: int, **annotations) -> Word | None:
+        """Word of the lemma with the given annotations, the others unset.
+
+        e.g. inflection(idx, ptosi=Ptosi.Gen, number=Number.Sing, gender=Gender.Fem)
+
+        Raises:
+            TypeError: If an annotation is not in ANNOTATION_FIELDS
+        """
+        unknown = set(annotations) - set(ANNOTATION_FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown annotations: {', '.join(sorted(unknown))}")
+        key = tuple(annotations.get(field) for field in ANNOTATION_FIELDS)
+        idx = self.inflection_index(lemma_index, key)
+        return None if idx is None else self.dictionary.words[idx]
@@ -0,0 +1,44 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Mapping, Sequence
+
+from dictionary.accentless import drop_greek_accents
+
+
+def parse_frequency_file(path: Path) -> dict[str, int]:
+    """Read a "<form> <rank>" frequency file once into accentless form -> rank.
+
+    If multiple word forms map to the same accentless form, it receives the
+    maximum rank. Malformed lines are skipped.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Frequency file not found at {path}")
+    ranks: dict[str, int] = defaultdict(int)
+    with path.open("r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            try:
+                frequency_rank = int(parts[1])
+            except ValueError:
+                continue
+            accentless_form = drop_greek_accents(parts[0])
+            if frequency_rank > ranks[accentless_form]:
+                ranks[accentless_form] = frequency_rank
+    return dict(ranks)
+
+
+def lemma_ranks(
+    form_ranks: Mapping[str, int], accentless_form_lemmas: Mapping[str, Sequence[str]]
+) -> dict[str, int]:
+    """Lemma -> maximum rank of its forms, from accentless form -> rank.
+
+    If a form maps to multiple lemmas, all of them receive its rank.
+    """
+    ranks: dict[str, int] = defaultdict(int)
+    for accentless_form, frequency_rank in form_ranks.items():
+        for lemma in accentless_form_lemmas.get(accentless_form, ()):
+            if frequency_rank > ranks[lemma]:
+                ranks[lemma] = frequency_rank
+    return dict(ranks)
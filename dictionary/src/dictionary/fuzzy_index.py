@@ -0,0 +1,208 @@
+"""Typo-tolerant lookup of word forms (symmetric delete spelling correction).
+
+Every accentless, lowercased form is a term. At build time each term's first
+PREFIX_LENGTH characters are reduced by up to MAX_EDIT_DISTANCE deletions,
+and every resulting string maps to the terms it came from. A query generates
+the deletions of its own prefix the same way, so two strings within the edit
+distance share a delete; only the terms found under the query's deletes are
+checked with a real (bounded) edit distance. The number of deletes per query
+depends on PREFIX_LENGTH and MAX_EDIT_DISTANCE only, not on the vocabulary.
+
+Terms are ordered by frequency_rank, most frequent first, so every deletes
+list is sorted by frequency too. The deletes are derived from the terms, so
+only the terms are serialized and the deletes are rebuilt on load.
+"""
+
+from typing import Any, NamedTuple
+
+from pydantic import BaseModel, PrivateAttr
+
+from dictionary.config import artifact_codecs, fuzzy_index_cache_path
+from dictionary.data_types import Word
+from dictionary.dictionary_index import accentless_key
+from dictionary.utils import CacheFormat, cache_to_file
+from dictionary.words import create_words_stage_2
+
+FUZZY_INDEX_FORMAT = "lexico-fuzzy"
+FUZZY_INDEX_VERSION = 2
+
+# Largest edit distance the index can answer
+MAX_EDIT_DISTANCE = 2
+# Characters of a term that deletes are generated from
+PREFIX_LENGTH = 7
+
+
+class Suggestion(NamedTuple):
+    term: str
+    distance: int
+    frequency_rank: int
+    # Indices into create_words_stage_2() (= Dictionary.words)
+    word_indices: list[int]
+
+
+class FuzzyIndex(BaseModel):
+    format: str = FUZZY_INDEX_FORMAT
+    version: int = FUZZY_INDEX_VERSION
+    max_distance: int = MAX_EDIT_DISTANCE
+    prefix_length: int = PREFIX_LENGTH
+    # Accentless terms, most frequent first
+    terms: list[str]
+    frequency_ranks: list[int]
+    # Term i's words are word_indices[word_offsets[i]:word_offsets[i + 1]]
+    word_offsets: list[int]
+    word_indices: list[int]
+    # Delete of a term prefix -> term ids; not serialized
+    _term_deletes: dict[str, list[int]] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, context: Any) -> None:
+        # Terms sharing a prefix share its deletes
+        prefix_deletes: dict[str, set[str]] = {}
+        for term_id, term in enumerate(self.terms):
+            prefix = term[: self.prefix_length]
+            if prefix not in prefix_deletes:
+                prefix_deletes[prefix] = _deletes(prefix, self.max_distance)
+            for delete in prefix_deletes[prefix]:
+                self._term_deletes.setdefault(delete, []).append(term_id)
+
+    def lookup(
+        self, text: str, limit: int = 10, max_distance: int | None = None
+    ) -> list[Suggestion]:
+        """Terms within `max_distance` edits of the text, ignoring accents and case.
+
+        Edits are insertions, deletions, substitutions and transpositions of
+        adjacent characters.
+
+        Returns:
+            At most `limit` suggestions, closest first, then most frequent
+
+        Raises:
+            ValueError: If max_distance exceeds the distance the index was built for
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(
+                f"Index supports edit distance up to {self.max_distance},"
+                f" got {max_distance}"
+            )
+        query = accentless_key(text)
+        prefix = query[: self.prefix_length]
+        # A term prefix within the distance is found under one of these deletes
+        candidates = _deletes(prefix, max_distance)
+
+        distances: dict[int, int] = {}
+        for candidate in candidates:
+            for term_id in self._term_deletes.get(candidate, ()):
+                if term_id in distances:
+                    continue
+                term = self.terms[term_id]
+                if abs(len(term) - len(query)) > max_distance:
+                    distances[term_id] = max_distance + 1
+                else:
+                    distances[term_id] = edit_distance(query, term, max_distance)
+
+        found = sorted(
+            (distance, term_id)
+            for term_id, distance in distances.items()
+            if distance <= max_distance
+        )
+        return [
+            Suggestion(
+                term=self.terms[term_id],
+                distance=distance,
+                frequency_rank=self.frequency_ranks[term_id],
+                word_indices=self.word_indices[
+                    self.word_offsets[term_id] : self.word_offsets[term_id + 1]
+                ],
+            )
+            for distance, term_id in found[:limit]
+        ]
+
+
+@cache_to_file(
+    fuzzy_index_cache_path,
+    FuzzyIndex,
+    cache_format=CacheFormat.COMPACT_JSON,
+    codecs=artifact_codecs,
+)
+def create_fuzzy_index() -> FuzzyIndex:
+    """Creates the typo-tolerant index over the forms of create_words_stage_2().
+
+    Cached to io/output/fuzzy_index.json
+    """
+    return build_fuzzy_index(create_words_stage_2())
+
+
+def build_fuzzy_index(
+    words: list[Word],
+    max_distance: int = MAX_EDIT_DISTANCE,
+    prefix_length: int = PREFIX_LENGTH,
+) -> FuzzyIndex:
+    """Index the accentless forms of the words, weighted by frequency_rank."""
+    term_words: dict[str, list[int]] = {}
+    term_ranks: dict[str, int] = {}
+    for idx, word in enumerate(words):
+        term = accentless_key(word.form)
+        if not term:
+            continue
+        term_words.setdefault(term, []).append(idx)
+        term_ranks[term] = max(term_ranks.get(term, 0), word.frequency_rank or 0)
+
+    terms = sorted(term_words, key=lambda term: (-term_ranks[term], term))
+    word_offsets = [0]
+    word_indices: list[int] = []
+    for term in terms:
+        word_indices.extend(term_words[term])
+        word_offsets.append(len(word_indices))
+
+    return FuzzyIndex(
+        max_distance=max_distance,
+        prefix_length=prefix_length,
+        terms=terms,
+        frequency_ranks=[term_ranks[term] for term in terms],
+        word_offsets=word_offsets,
+        word_indices=word_indices,
+    )
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or max_distance + 1 if it is larger.
+
+    Stops as soon as a whole row of the table exceeds max_distance.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def _deletes(text: str, max_distance: int) -> set[str]:
+    """The text and every string made from it by up to max_distance deletions."""
+    result = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1 :]
+            for candidate in frontier
+            for i in range(len(candidate))
+        } - result
+        result |= frontier
+    return result
+
+
+if __name__ == "__main__":
+    create_fuzzy_index()
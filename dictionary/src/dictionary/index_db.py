@@ -0,0 +1,80 @@
+"""Post-import step for dict.db: indexes for the extraction queries in dictionary.db."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+from dictionary.config import db_path
+from dictionary.db import (
+    FORM_LEMMA_PAIRS_QUERY,
+    TRANSLATIONS_QUERY,
+    WORDS_BY_FORMS_QUERY,
+    WORDS_BY_LEMMAS_QUERY,
+)
+
+INDEXES = {
+    # Form lookups (words.py) and DISTINCT form, lemma (accentless.py), covering
+    "words_form_lemma_idx": "words(form, lemma)",
+    # Lemma lookups (words.py)
+    "words_lemma_idx": "words(lemma)",
+    # Filter and ORDER BY of translations.py, covering and without a sort step
+    "translations_src_lemma_idx": "translations(src, src_lemma, dest, dest_lemma)",
+}
+
+# Queries whose plans must read words and translations through an index.
+# Dumps may ship their own equivalent indexes, which SQLite may prefer.
+CHECKED_QUERIES = (
+    WORDS_BY_FORMS_QUERY,
+    WORDS_BY_LEMMAS_QUERY,
+    FORM_LEMMA_PAIRS_QUERY,
+    TRANSLATIONS_QUERY,
+)
+
+
+def index_db(path: Path = db_path) -> None:
+    """Create indexes, ANALYZE and VACUUM dict.db, then check query plans use indexes.
+
+    Raises:
+        RuntimeError: If a query plan scans a table without an index
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Database not found at {path}")
+    conn = sqlite3.connect(path)
+    try:
+        for name, target in INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.execute("VACUUM")
+        for query in CHECKED_QUERIES:
+            plan = _query_plan(conn, query)
+            if any(_is_table_scan(step) for step in plan.splitlines()):
+                raise RuntimeError(
+                    f"Query scans a table without an index:\n{query}\nPlan:\n{plan}"
+                )
+    finally:
+        conn.close()
+
+
+def _query_plan(conn: sqlite3.Connection, query: str) -> str:
+    params = ("[]",) if "?" in query else ()
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def _is_table_scan(step: str) -> bool:
+    """Whether a plan step reads a whole table rather than an index.
+
+    The json_each virtual table of the lookup keys is not a table scan.
+    """
+    return (
+        step.startswith("SCAN ")
+        and "VIRTUAL TABLE" not in step
+        and "USING INDEX" not in step
+        and "USING COVERING INDEX" not in step
+    )
+
+
+if __name__ == "__main__":
+    index_db(Path(sys.argv[1]) if len(sys.argv) > 1 else db_path)
@@ -2,14 +2,19 @@ from collections import defaultdict
 from typing import Sequence
 from pydantic import TypeAdapter
 
-from dictionary.config import lemmas_cache_path
+from dictionary.config import incremental_build, lemmas_cache_path
 from dictionary.data_types import Lemma, Word
 from dictionary.lemma_ranking import create_lemma_ranking
 from dictionary.translations import create_translations
-from dictionary.utils import cache_to_file
+from dictionary.utils import CacheFormat, cache_to_file
 
 
-@cache_to_file(lemmas_cache_path, TypeAdapter(list[Lemma]))
+@cache_to_file(
+    lemmas_cache_path,
+    TypeAdapter(list[Lemma]),
+    cache_format=CacheFormat.BINARY,
+    incremental=True,
+)
 def create_lemmas() -> list[Lemma]:
     """Creates the list of lemmas.
 
@@ -19,7 +24,8 @@ def create_lemmas() -> list[Lemma]:
     - Enrich Lemma object with translation
     - Add frequency rank to the Lemma object from create_lemma_ranking().
     - Sort lemmas by frequency rank desc (most frequent first)
-    - Cache output to io/lemmas.json.
+    - In incremental mode, keep the previous order and append new lemmas.
+    - Cache output to io/output/lemmas.bin.
     """
     from dictionary.words import create_words_stage_1
 
@@ -47,9 +53,41 @@ def create_lemmas() -> list[Lemma]:
         if _lemma_filter(lemma_obj, words):
             lemmas.append(lemma_obj)
     lemmas.sort(key=lambda x: -x.frequency_rank)
+    previous_order = {
+        (lemma.pos_en, lemma.lemma): idx
+        for idx, lemma in enumerate(_previous_lemmas(words))
+    }
+    if previous_order:
+        # Stable sort: previous lemmas keep their indices, new ones follow by rank
+        lemmas.sort(
+            key=lambda x: previous_order.get((x.pos_en, x.lemma), len(previous_order))
+        )
     return lemmas
 
 
+def _previous_lemmas(words: Sequence[Word]) -> list[Lemma]:
+    """Previous output to keep the order of in incremental mode, or [].
+
+    Only usable if the words it indexes are still at the same positions,
+    i.e. create_words_stage_1 appended to its previous output.
+    """
+    if not incremental_build():
+        return []
+    from dictionary.words import create_words_stage_1
+
+    if not create_lemmas.unchanged_except(create_words_stage_1):
+        return []
+    previous = create_lemmas.load_previous() or []
+    for lemma in previous:
+        for idx in lemma.word_indices:
+            if idx >= len(words):
+                return []
+            word = words[idx]
+            if (word.pos_en, word.lemma) != (lemma.pos_en, lemma.lemma):
+                return []
+    return previous
+
+
 def _lemma_filter(x: Lemma, words: Sequence[Word]) -> bool:
     is_incomplete = False
     if len(x.word_indices) == 1:
@@ -65,3 +65,97 @@ def word_from_record(record: dict) -> Word:
         voice=voice,
         tags=tags,
     )
+
+
+# Enum-valued Word identity fields, in Word._identity_fields order.
+WORD_ENUM_FIELDS = (
+    ("pos_en", "pos", PartOfSpeechEnglish),
+    ("pos_el", "greek_pos", PartOfSpeechGreek),
+    ("gender", "gender", Gender),
+    ("ptosi", "ptosi", Ptosi),
+    ("number", "number", Number),
+    ("degree", "degree", Degree),
+    ("person", "person", Person),
+    ("tense", "tense", Tense),
+    ("aspect", "aspect", Aspect),
+    ("mood", "mood", Mood),
+    ("verbform", "verbform", VerbForm),
+    ("voice", "voice", Voice),
+)
+
+# Per enum field: value -> code, and code -> member. -1 stands for None.
+_value_codes = [
+    {member.value: code for code, member in enumerate(enum_type)}
+    for _, _, enum_type in WORD_ENUM_FIELDS
+]
+_code_members = [list(enum_type) for _, _, enum_type in WORD_ENUM_FIELDS]
+
+
+class WordRecord:
+    """Compact build-time counterpart of Word.
+
+    `key` is Word's identity: form, lemma, then the enum fields as small int
+    codes (-1 for None). Equality and the cached hash use the key only, so
+    sets of records deduplicate like sets of Word.
+    Convert with to_word() at the serialization boundary.
+    """
+
+    __slots__ = ("key", "tags", "frequency_rank", "_hash")
+
+    def __init__(self, key: tuple, tags: str | None = None):
+        self.key = key
+        self.tags = tags
+        self.frequency_rank: int | None = None
+        self._hash = hash(key)
+
+    @property
+    def form(self) -> str:
+        return self.key[0]
+
+    @property
+    def lemma(self) -> str:
+        return self.key[1]
+
+    def __eq__(self, other):
+        return isinstance(other, WordRecord) and self.key == other.key
+
+    def __hash__(self):
+        return self._hash
+
+    def to_word(self) -> Word:
+        fields = {
+            name: members[code] if code != -1 else None
+            for (name, _, _), members, code in zip(
+                WORD_ENUM_FIELDS, _code_members, self.key[2:]
+            )
+        }
+        return Word.model_construct(
+            form=self.key[0],
+            lemma=self.key[1],
+            frequency_rank=self.frequency_rank,
+            tags=self.tags,
+            **fields,
+        )
+
+
+def word_record_from_record(record: dict) -> WordRecord:
+    """Convert a database record (dict) to a WordRecord.
+
+    Same rules as word_from_record, without building a pydantic model.
+
+    Raises:
+        ValueError: If a column holds a value its enum does not define
+    """
+    key = [record["form"], record["lemma"]]
+    for (name, column, enum_type), codes in zip(WORD_ENUM_FIELDS, _value_codes):
+        value = record.get(column)
+        if value is None or value == "":
+            key.append(-1)
+            continue
+        if column == "person":
+            value = str(value)
+        try:
+            key.append(codes[value])
+        except KeyError:
+            raise ValueError(f"{value!r} is not a valid {enum_type.__name__}")
+    return WordRecord(tuple(key), record.get("tags") or None)
@@ -0,0 +1,106 @@
+"""Form -> example phrases index over every available sentence.
+
+Built in one tokenizing pass over phrases-selected.json (all entries, not
+only the first per word) and sentence-pairs.txt. Each form keeps its best
+MAX_PHRASES_PER_FORM phrases, so a lookup is a single dict access.
+
+Phrases are ranked by difficulty, then length. The difficulty of a phrase for
+a form is the frequency of its rarest other word, in orders of magnitude:
+phrases whose words are all common come first.
+"""
+
+import heapq
+import re
+
+from pydantic import BaseModel
+
+from dictionary.accentless import drop_greek_accents
+from dictionary.config import (
+    phrase_index_cache_path,
+    phrases_selected_path,
+    sentence_pairs_source_path,
+)
+from dictionary.data_types import Phrase
+from dictionary.dedup import PhraseDeduplicator
+from dictionary.phrases import iter_selected_phrases
+from dictionary.sentence_phrases import iter_sentence_pairs, read_sentence_lines
+from dictionary.utils import CacheFormat, cache_to_file
+from dictionary.word_ranking import create_word_ranking
+
+# Phrases kept per form
+MAX_PHRASES_PER_FORM = 8
+
+_WORDS = re.compile(r"\w+")
+
+
+class PhraseIndex(BaseModel):
+    phrases: list[Phrase]
+    # Lowercased form -> indices into phrases, best first
+    forms: dict[str, list[int]]
+
+    def get(self, form: str, n: int | None = None) -> list[Phrase]:
+        """Best phrases containing the form, at most n."""
+        indices = self.forms.get(form.lower(), [])
+        return [self.phrases[idx] for idx in indices[:n]]
+
+
+@cache_to_file(
+    phrase_index_cache_path,
+    PhraseIndex,
+    inputs=[phrases_selected_path, sentence_pairs_source_path],
+    cache_format=CacheFormat.BINARY,
+)
+def create_phrase_index() -> PhraseIndex:
+    """Creates the form -> phrases index
+
+    Near-duplicate sentences are dropped, curated phrases win over sentence
+    pairs. Cached to io/output/phrase_index.bin
+    """
+    word_ranking = create_word_ranking()
+    deduplicator = PhraseDeduplicator()
+    phrases: list[Phrase] = []
+    # Form -> (difficulty key, phrase index) for every phrase containing it
+    postings: dict[str, list[tuple[tuple[int, int], int]]] = {}
+
+    def add(phrase: Phrase) -> None:
+        if deduplicator.is_duplicate(phrase.greek):
+            return
+        idx = len(phrases)
+        phrases.append(phrase)
+        words = _WORDS.findall(phrase.greek)
+        tokens = {word.lower() for word in words}
+        frequencies = sorted(
+            (word_ranking.get(drop_greek_accents(token), 0), token)
+            for token in tokens
+        )
+        rarest = frequencies[0][1] if frequencies else None
+        for token in tokens:
+            # The form itself does not make a phrase harder for that form
+            if token == rarest:
+                frequency = frequencies[1][0] if len(frequencies) > 1 else 0
+            else:
+                frequency = frequencies[0][0]
+            key = (-frequency.bit_length(), len(words))
+            postings.setdefault(token, []).append((key, idx))
+
+    for _, phrase in iter_selected_phrases():
+        add(phrase)
+    for greek, english in iter_sentence_pairs(
+        read_sentence_lines(sentence_pairs_source_path)
+    ):
+        add(Phrase(greek=greek, english=english))
+
+    forms = {
+        form: [idx for _, idx in heapq.nsmallest(MAX_PHRASES_PER_FORM, entries)]
+        for form, entries in postings.items()
+    }
+    # Keep only the phrases that made some form's list
+    kept = sorted({idx for indices in forms.values() for idx in indices})
+    new_index = {idx: new_idx for new_idx, idx in enumerate(kept)}
+    return PhraseIndex(
+        phrases=[phrases[idx] for idx in kept],
+        forms={
+            form: [new_index[idx] for idx in indices]
+            for form, indices in forms.items()
+        },
+    )
@@ -1,37 +1,52 @@
 import json
 import re
+from typing import Iterator
 
 from dictionary.config import phrases_cache_path, phrases_selected_path
 from dictionary.data_types import Phrase
-from dictionary.utils import cache_to_file
+from dictionary.utils import CacheFormat, cache_to_file
 from pydantic import TypeAdapter
 
 AccentedForm = str
 
 
-@cache_to_file(phrases_cache_path, TypeAdapter(dict[AccentedForm, Phrase]))
+@cache_to_file(
+    phrases_cache_path,
+    TypeAdapter(dict[AccentedForm, Phrase]),
+    inputs=[phrases_selected_path],
+    cache_format=CacheFormat.BINARY,
+)
 def extract_phrases() -> dict[AccentedForm, Phrase]:
     """Creates form->Phrase mapping
 
     Extracts data from io/phrases/phrases-selected.json
-    Caches to io/phrases.json
+    Caches to io/output/phrases.bin
+    """
+    phrases_map: dict[AccentedForm, Phrase] = {}
+    for word, phrase in iter_selected_phrases():
+        if word in phrases_map:
+            continue
+        phrases_map[word] = phrase
+    return phrases_map
+
+
+def iter_selected_phrases() -> Iterator[tuple[AccentedForm, Phrase]]:
+    """Yield (word, phrase) for every entry of io/phrases/phrases-selected.json
+
+    Entries without a word are skipped; highlighting markers are removed.
     """
     if not phrases_selected_path.exists():
         raise FileNotFoundError(f"Phrases file not found at {phrases_selected_path}")
     with open(phrases_selected_path, "r", encoding="utf-8") as f:
         data = json.load(f)
-    phrases_map: dict[AccentedForm, Phrase] = {}
     for partition in data.get("partitions", []):
         for phrase_entry in partition.get("phrases", []):
             word = phrase_entry.get("word")
             if not word:
                 continue
-            if word in phrases_map:
-                continue
             greek_phrase = phrase_entry.get("greek_phrase", "").strip()
             english_phrase = phrase_entry.get("english_phrase", "").strip()
             # Remove ** markers used for highlighting
             greek_phrase = re.sub(r"\*\*([^*]+)\*\*", r"\1", greek_phrase)
             english_phrase = re.sub(r"\*\*([^*]+)\*\*", r"\1", english_phrase)
-            phrases_map[word] = Phrase(greek=greek_phrase, english=english_phrase)
-    return phrases_map
+            yield word, Phrase(greek=greek_phrase, english=english_phrase)
@@ -0,0 +1,122 @@
+"""Runs the cached create_* stages as a DAG, independent stages in parallel."""
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from dictionary.accentless import create_accentless_form_to_lemmas_mapping
+from dictionary.columnar import create_columnar_dictionary
+from dictionary.db import close_connection
+from dictionary.dictionary import create_dictionary
+from dictionary.fuzzy_index import create_fuzzy_index
+from dictionary.lemma_ranking import create_lemma_ranking
+from dictionary.lemmas import create_lemmas
+from dictionary.phrase_index import create_phrase_index
+from dictionary.phrases import extract_phrases
+from dictionary.prefix_index import create_prefix_index
+from dictionary.reverse_translations import create_reverse_translation_index
+from dictionary.translations import create_translations
+from dictionary.word_cards import create_word_cards
+from dictionary.word_ranking import create_word_ranking
+from dictionary.words import create_words_stage_1, create_words_stage_2
+
+# Stage name -> (cached stage function, names of the stages it reads)
+STAGES = {
+    "translations": (create_translations, ()),
+    "word_ranking": (create_word_ranking, ()),
+    "accentless": (create_accentless_form_to_lemmas_mapping, ()),
+    "phrases": (extract_phrases, ()),
+    "phrase_index": (create_phrase_index, ("word_ranking",)),
+    "lemma_ranking": (create_lemma_ranking, ("accentless", "word_ranking")),
+    "words_stage_1": (create_words_stage_1, ("phrases", "word_ranking")),
+    "lemmas": (create_lemmas, ("words_stage_1", "translations", "lemma_ranking")),
+    "words_stage_2": (create_words_stage_2, ("words_stage_1", "lemmas")),
+    "reverse_translations": (create_reverse_translation_index, ("lemmas",)),
+    "fuzzy_index": (create_fuzzy_index, ("words_stage_2",)),
+    "word_cards": (create_word_cards, ("phrases", "phrase_index", "words_stage_2")),
+    "dictionary": (create_dictionary, ("lemmas", "words_stage_2", "word_cards")),
+    "columnar": (create_columnar_dictionary, ("dictionary",)),
+    "prefix_index": (create_prefix_index, ("dictionary",)),
+}
+
+
+def run_pipeline(jobs: int | None = None) -> dict[str, float]:
+    """Bring every stage up to date, running a stage as soon as its inputs are.
+
+    Each stage runs in a worker process and writes its own cache file; the
+    stage cache of the next stage picks it up from disk. Workers' dict.db
+    connections close with their processes; the in-process run closes its
+    connection when done.
+
+    Args:
+        jobs: Worker processes; defaults to the CPU count. 1 runs in-process.
+
+    Returns:
+        Stage name -> wall time in seconds
+    """
+    jobs = jobs or os.cpu_count() or 1
+    timings: dict[str, float] = {}
+    if jobs == 1:
+        try:
+            for name in STAGES:
+                timings[name], rebuilt = _run_stage(name)
+                _report(name, timings[name], rebuilt)
+        finally:
+            close_connection()
+        return timings
+
+    done: set[str] = set()
+    running: dict[Future, str] = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as executor:
+        while len(done) < len(STAGES):
+            for name, (_, deps) in STAGES.items():
+                if (
+                    name not in done
+                    and name not in running.values()
+                    and all(dep in done for dep in deps)
+                ):
+                    running[executor.submit(_run_stage, name)] = name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                timings[name], rebuilt = future.result()
+                _report(name, timings[name], rebuilt)
+                done.add(name)
+    return timings
+
+
+def _run_stage(name: str) -> tuple[float, bool]:
+    start = time.perf_counter()
+    stage, _ = STAGES[name]
+    rebuilt = stage.refresh()
+    return time.perf_counter() - start, rebuilt
+
+
+def _report(name: str, seconds: float, rebuilt: bool) -> None:
+    status = "built" if rebuilt else "cached"
+    print(f"{name:<15} {status:<7} {seconds:8.2f}s", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Patch previous outputs when only phrases changed, keeping indices stable",
+    )
+    args = parser.parse_args()
+    if args.incremental:
+        os.environ["DICTIONARY_INCREMENTAL"] = "1"
+    start = time.perf_counter()
+    run_pipeline(args.jobs)
+    print(f"{'total':<15} {'':<7} {time.perf_counter() - start:8.2f}s")
@@ -0,0 +1,135 @@
+"""Accent-insensitive prefix search over word forms and lemmas.
+
+A sorted string table: `keys` holds every distinct accentless, lowercased
+word form and lemma, and key i's postings are postings[offsets[i]:offsets[i + 1]].
+A prefix query bisects `keys` for the range of keys starting with the prefix,
+then merges their postings.
+
+Postings are positions in `ranked_lemmas` (lemma indices, most frequent
+first), so smaller is more frequent and every postings list is sorted. The
+ranges of one- and two-letter prefixes are large, so their top results are
+precomputed in `short_prefixes`.
+"""
+
+import heapq
+from bisect import bisect_left
+from typing import Iterator
+
+from pydantic import BaseModel
+
+from dictionary.config import artifact_codecs, prefix_index_cache_path
+from dictionary.data_types import Dictionary
+from dictionary.dictionary import create_dictionary
+from dictionary.dictionary_index import accentless_key
+from dictionary.utils import CacheFormat, cache_to_file
+
+PREFIX_INDEX_FORMAT = "lexico-prefix"
+PREFIX_INDEX_VERSION = 1
+
+# Prefixes up to this length have precomputed results
+SHORT_PREFIX_LENGTH = 2
+# Results precomputed per short prefix
+SHORT_PREFIX_RESULTS = 20
+
+# Sorts after any character a key continues the prefix with
+_MAX_CHAR = "\U0010ffff"
+
+
+class PrefixIndex(BaseModel):
+    format: str = PREFIX_INDEX_FORMAT
+    version: int = PREFIX_INDEX_VERSION
+    keys: list[str]
+    offsets: list[int]
+    postings: list[int]
+    ranked_lemmas: list[int]
+    short_prefixes: dict[str, list[int]]
+
+    def search(self, prefix: str, limit: int = 10) -> list[int]:
+        """Indices of the lemmas with a form or lemma starting with the prefix.
+
+        Accents and case are ignored. Most frequent lemmas first.
+        """
+        key = accentless_key(prefix)
+        if not key or limit <= 0:
+            return []
+        if len(key) <= SHORT_PREFIX_LENGTH and limit <= SHORT_PREFIX_RESULTS:
+            positions = self.short_prefixes.get(key, [])[:limit]
+        else:
+            positions = self._top_positions(key, limit)
+        return [self.ranked_lemmas[position] for position in positions]
+
+    def _top_positions(self, key: str, limit: int) -> list[int]:
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + _MAX_CHAR, start)
+        positions: list[int] = []
+        for position in heapq.merge(*(self._postings(i) for i in range(start, end))):
+            if not positions or positions[-1] != position:
+                positions.append(position)
+                if len(positions) == limit:
+                    break
+        return positions
+
+    def _postings(self, i: int) -> Iterator[int]:
+        for j in range(self.offsets[i], self.offsets[i + 1]):
+            yield self.postings[j]
+
+
+@cache_to_file(
+    prefix_index_cache_path,
+    PrefixIndex,
+    cache_format=CacheFormat.COMPACT_JSON,
+    codecs=artifact_codecs,
+)
+def create_prefix_index() -> PrefixIndex:
+    """Creates the prefix search index over create_dictionary().
+
+    Cached to io/output/prefix_index.json
+    """
+    return build_prefix_index(create_dictionary())
+
+
+def build_prefix_index(dictionary: Dictionary) -> PrefixIndex:
+    """Index the accentless forms and lemmas of the dictionary."""
+    lemmas = dictionary.lemmas
+    ranked_lemmas = sorted(
+        range(len(lemmas)), key=lambda idx: (-(lemmas[idx].frequency_rank or 0), idx)
+    )
+    position_of = {idx: position for position, idx in enumerate(ranked_lemmas)}
+
+    key_positions: dict[str, set[int]] = {}
+    for idx, lemma in enumerate(lemmas):
+        key_positions.setdefault(accentless_key(lemma.lemma), set()).add(
+            position_of[idx]
+        )
+    for word in dictionary.words:
+        if word.lemma_index != -1:
+            key_positions.setdefault(accentless_key(word.form), set()).add(
+                position_of[word.lemma_index]
+            )
+    key_positions.pop("", None)
+
+    keys = sorted(key_positions)
+    offsets = [0]
+    postings: list[int] = []
+    short_positions: dict[str, set[int]] = {}
+    for key in keys:
+        positions = key_positions[key]
+        postings.extend(sorted(positions))
+        offsets.append(len(postings))
+        for length in range(1, min(len(key), SHORT_PREFIX_LENGTH) + 1):
+            short_positions.setdefault(key[:length], set()).update(positions)
+
+    return PrefixIndex(
+        keys=keys,
+        offsets=offsets,
+        postings=postings,
+        ranked_lemmas=ranked_lemmas,
+        short_prefixes={
+            prefix: heapq.nsmallest(SHORT_PREFIX_RESULTS, positions)
+            for prefix, positions in sorted(short_positions.items())
+        },
+    )
+
+
+if __name__ == "__main__":
+    create_prefix_index()
@@ -0,0 +1,101 @@
+"""Old -> new index remapping between two dictionary versions.
+
+The app stores queues as raw indices into words, lemmas and word_cards.
+A remap lets it migrate them in O(n) without loading both dictionaries:
+new_index = remap.words[old_index], or -1 if the entry was removed.
+Like a delta, it is built against the previously published dictionary,
+which is what clients hold.
+"""
+
+import argparse
+import gzip
+import hashlib
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from dictionary.config import dictionary_cache_path, output_directory
+from dictionary.data_types import Dictionary
+
+REMAP_VERSION = 1
+
+
+class IndexRemap(BaseModel):
+    version: int = REMAP_VERSION
+    from_hash: str
+    to_hash: str
+    words: list[int]
+    lemmas: list[int]
+    word_cards: list[int]
+
+
+def dictionary_hash(dictionary: Dictionary) -> str:
+    """sha256 of the compact JSON serialization of the dictionary."""
+    return hashlib.sha256(
+        dictionary.model_dump_json(exclude_none=True).encode("utf-8")
+    ).hexdigest()
+
+
+def create_index_remap(old: Dictionary, new: Dictionary) -> IndexRemap:
+    """Map every index of `old` to the index of the same entry in `new`.
+
+    Words are matched by their identity (Word.__eq__), lemmas by
+    (pos_en, lemma), word cards by form.
+    """
+    new_words = {word: idx for idx, word in enumerate(new.words)}
+    new_lemmas = {
+        (lemma.pos_en, lemma.lemma): idx for idx, lemma in enumerate(new.lemmas)
+    }
+    new_cards = {card.form: idx for idx, card in enumerate(new.word_cards)}
+    return IndexRemap(
+        from_hash=dictionary_hash(old),
+        to_hash=dictionary_hash(new),
+        words=[new_words.get(word, -1) for word in old.words],
+        lemmas=[
+            new_lemmas.get((lemma.pos_en, lemma.lemma), -1) for lemma in old.lemmas
+        ],
+        word_cards=[new_cards.get(card.form, -1) for card in old.word_cards],
+    )
+
+
+def build_index_remap_artifacts(
+    previous_path: Path,
+    current_path: Path | None = None,
+    out_dir: Path | None = None,
+) -> tuple[Path, Path]:
+    """
+    Write dictionary-remap-{from6}-{to6}.json.gz and dictionary-remap-current.txt.
+    Returns (gzip_path, manifest_path).
+    """
+    current_path = current_path or dictionary_cache_path
+    out = out_dir or output_directory
+    out.mkdir(parents=True, exist_ok=True)
+
+    old = Dictionary.model_validate_json(previous_path.read_bytes())
+    new = Dictionary.model_validate_json(current_path.read_bytes())
+    remap = create_index_remap(old, new)
+
+    basename = f"dictionary-remap-{remap.from_hash[:6]}-{remap.to_hash[:6]}.json.gz"
+    gz_path = out / basename
+    manifest_path = out / "dictionary-remap-current.txt"
+    with gzip.GzipFile(filename=str(gz_path), mode="wb", mtime=0) as f:
+        f.write(remap.model_dump_json().encode("utf-8"))
+    manifest_path.write_text(basename + "\n", encoding="utf-8")
+    return gz_path, manifest_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "previous", type=Path, help="Previously published dictionary.json"
+    )
+    parser.add_argument(
+        "-o",
+        "--out",
+        type=Path,
+        default=None,
+        help="Output directory (default: io/output)",
+    )
+    args = parser.parse_args()
+    gz, manifest = build_index_remap_artifacts(args.previous, out_dir=args.out)
+    print(f"{gz}\n{manifest}")
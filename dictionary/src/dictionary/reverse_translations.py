@@ -0,0 +1,97 @@
+"""English/Russian word -> Greek lemmas index.
+
+Translations are split into case-folded words (for Russian, ё is folded to
+е); each word maps to the indices of the lemmas with a translation containing
+it, most frequent lemma first. Lemma indices refer to create_lemmas(), which
+are Dictionary.lemmas.
+"""
+
+import re
+
+from pydantic import BaseModel
+
+from dictionary.config import artifact_codecs, reverse_translations_cache_path
+from dictionary.data_types import Lemma
+from dictionary.lemmas import create_lemmas
+from dictionary.utils import CacheFormat, cache_to_file
+
+REVERSE_TRANSLATIONS_FORMAT = "lexico-reverse-translations"
+REVERSE_TRANSLATIONS_VERSION = 1
+
+LANGUAGES = ("en", "ru")
+
+_WORDS = re.compile(r"\w+")
+
+
+def translation_tokens(text: str) -> list[str]:
+    """Case-folded words of a translation or query, in order."""
+    return _WORDS.findall(text.casefold().replace("ё", "е"))
+
+
+class ReverseTranslationIndex(BaseModel):
+    format: str = REVERSE_TRANSLATIONS_FORMAT
+    version: int = REVERSE_TRANSLATIONS_VERSION
+    # Language -> word -> lemma indices, most frequent first
+    languages: dict[str, dict[str, list[int]]]
+
+    def lookup(
+        self, text: str, lang: str = "en", limit: int | None = None
+    ) -> list[int]:
+        """Indices of the lemmas whose translations contain every word of the text.
+
+        Raises:
+            KeyError: If the language is not indexed
+        """
+        postings = self.languages[lang]
+        tokens = translation_tokens(text)
+        if not tokens:
+            return []
+        # Filter the shortest list by the others; it keeps the frequency order
+        lists = sorted((postings.get(token, []) for token in tokens), key=len)
+        others = [set(indices) for indices in lists[1:]]
+        result = [idx for idx in lists[0] if all(idx in indices for indices in others)]
+        return result[:limit]
+
+
+@cache_to_file(
+    reverse_translations_cache_path,
+    ReverseTranslationIndex,
+    cache_format=CacheFormat.COMPACT_JSON,
+    codecs=artifact_codecs,
+)
+def create_reverse_translation_index() -> ReverseTranslationIndex:
+    """Creates the English/Russian -> lemma index.
+
+    Cached to io/output/reverse_translations.json
+    """
+    return build_reverse_translation_index(create_lemmas())
+
+
+def build_reverse_translation_index(lemmas: list[Lemma]) -> ReverseTranslationIndex:
+    """Index the translations of the lemmas, postings ranked by frequency_rank."""
+    ranked = sorted(
+        range(len(lemmas)), key=lambda idx: (-(lemmas[idx].frequency_rank or 0), idx)
+    )
+    languages: dict[str, dict[str, list[int]]] = {lang: {} for lang in LANGUAGES}
+    for idx in ranked:
+        translation = lemmas[idx].translation
+        if translation is None:
+            continue
+        for lang, postings in languages.items():
+            tokens = {
+                token
+                for text in getattr(translation, lang)
+                for token in translation_tokens(text)
+            }
+            for token in tokens:
+                postings.setdefault(token, []).append(idx)
+    return ReverseTranslationIndex(
+        languages={
+            lang: dict(sorted(postings.items()))
+            for lang, postings in languages.items()
+        }
+    )
+
+
+if __name__ == "__main__":
+    create_reverse_translation_index()
@@ -2,97 +2,460 @@
 
 from __future__ import annotations
 
-import gzip
+import argparse
+import codecs
 import hashlib
 import json
+import os
+import re
 from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Sequence
 
+from pydantic import BaseModel
+
+from dictionary.compression import compressed_path, open_compressor
 from dictionary.config import output_directory, sentence_pairs_source_path
 from dictionary.data_types import Phrase
+from dictionary.dedup import PhraseDeduplicator
 
+# Part of the payload hash: bump when the parser or the payload format changes
+# what the same source produces, so the new payload gets a new file name
+PHRASES_FORMAT_VERSION = 2
+SHARD_MANIFEST_NAME = "phrases-shards-current.json"
+SHARD_MANIFEST_VERSION = 3
+# Average number of phrases per shard
+PHRASE_SHARD_SIZE = 1000
+# Source files are read in chunks of this many bytes
+READ_CHUNK_SIZE = 1 << 20
+# Pairs classified with less confidence are listed by --report
+LOW_CONFIDENCE = 0.8
+# Blocks whose letters are counted in one pass
+CLASSIFY_BATCH_SIZE = 4096
 
-def _count_greek_letters(s: str) -> int:
-    """Count letters in Greek and Coptic + Greek Extended Unicode blocks."""
-    n = 0
-    for c in s:
-        o = ord(c)
-        if 0x0370 <= o <= 0x03FF or 0x1F00 <= o <= 0x1FFF:
-            n += 1
-    return n
+# Everything but newlines outside the Greek and Coptic + Greek Extended blocks
+_NON_GREEK_RUNS = re.compile("[^\u0370-\u03ff\u1f00-\u1fff\n]+")
+# Every byte but newlines and ASCII letters
+_NON_LATIN_BYTES = bytes(
+    b for b in range(256) if not (0x41 <= b <= 0x5A or 0x61 <= b <= 0x7A or b == 0x0A)
+)
+# Every ASCII byte but newlines; never part of a multi-byte UTF-8 character
+_ASCII_BYTES = bytes(b for b in range(0x80) if b != 0x0A)
 
 
-def _count_latin_letters(s: str) -> int:
-    return sum(1 for c in s if "A" <= c <= "Z" or "a" <= c <= "z")
+class PhraseShard(BaseModel):
+    file: str
+    # sha256 of the shard's uncompressed JSON, also its file name
+    hash: str
+    # Phrases start:start + count of the full list
+    start: int
+    count: int
 
 
-def _assign_greek_english_pair(line_a: str, line_b: str) -> tuple[str, str]:
-    """Pick Greek vs English by which line has more Greek letters; tie-break with Latin counts."""
-    ga, gb = _count_greek_letters(line_a), _count_greek_letters(line_b)
-    if ga > gb:
-        return line_a, line_b
-    if gb > ga:
-        return line_b, line_a
-    la, lb = _count_latin_letters(line_a), _count_latin_letters(line_b)
-    if la > lb:
-        return line_b, line_a
-    if lb > la:
-        return line_a, line_b
-    return line_a, line_b
+class PhraseShardManifest(BaseModel):
+    version: int = SHARD_MANIFEST_VERSION
+    # hash6 of the single-file payload built from the same source and settings
+    phrases_hash: str
+    count: int
+    shards: list[PhraseShard]
 
 
-def parse_bilingual_sentence_file(text: str) -> list[Phrase]:
-    """Blocks are runs of non-empty lines (after trim); runs are separated by blank lines."""
-    lines = [ln.strip() for ln in text.splitlines()]
-    blocks: list[list[str]] = []
-    cur: list[str] = []
+class SentencePair(NamedTuple):
+    greek: str
+    english: str
+    # Share of Greek letters on the Greek side and of Latin letters on the
+    # English side, whichever is lower: 1.0 for clean pairs, 0.0 if a side has
+    # no letters of its script
+    confidence: float
+
+
+def _script_counts(lines: Sequence[str]) -> list[tuple[int, int]]:
+    """(Greek and Coptic + Greek Extended characters, ASCII letters) per line.
+
+    Counts all lines at once over the lines joined by newlines, instead of a
+    Python loop over every character: bytes.translate keeps the ASCII letters,
+    and a regex keeps the Greek characters after ASCII bytes are dropped.
+    """
+    text = "\n".join(lines)
+    if text.count("\n") != len(lines) - 1:
+        # A line contains a newline itself: count line by line
+        return [_script_counts([line.replace("\n", " ")])[0] for line in lines]
+    encoded = text.encode("utf-8")
+    non_ascii = encoded.translate(None, _ASCII_BYTES).decode("utf-8")
+    greek = _NON_GREEK_RUNS.sub("", non_ascii).split("\n")
+    latin = encoded.translate(None, _NON_LATIN_BYTES).split(b"\n")
+    return list(zip(map(len, greek), map(len, latin)))
+
+
+def _purity(count: int, other: int) -> float:
+    return count / (count + other) if count else 0.0
+
+
+def classify_sentence_block(lines: Sequence[str]) -> SentencePair | None:
+    """Split a block of two or more lines into its Greek and English sides.
+
+    Two lines: the line with more Greek letters is Greek; ties go to the line
+    with fewer Latin letters, then to the first line.
+    More lines: each line goes to the script it has more letters of (lines
+    without a majority follow the previous line) and each side is joined with
+    spaces. If all lines have the same script, the first two lines are
+    classified as a pair.
+
+    Returns:
+        None for blocks of fewer than two lines
+    """
+    if len(lines) < 2:
+        return None
+    return _classify_block(lines, _script_counts(lines))
+
+
+def _classify_block(
+    lines: Sequence[str], counts: Sequence[tuple[int, int]]
+) -> SentencePair:
+    if len(lines) > 2:
+        greek_side: list[int] = []
+        english_side: list[int] = []
+        side = english_side
+        for i, (greek, latin) in enumerate(counts):
+            if greek != latin:
+                side = greek_side if greek > latin else english_side
+            side.append(i)
+        if greek_side and english_side:
+            greek_greek = sum(counts[i][0] for i in greek_side)
+            greek_latin = sum(counts[i][1] for i in greek_side)
+            english_greek = sum(counts[i][0] for i in english_side)
+            english_latin = sum(counts[i][1] for i in english_side)
+            return SentencePair(
+                greek=" ".join(lines[i] for i in greek_side),
+                english=" ".join(lines[i] for i in english_side),
+                confidence=min(
+                    _purity(greek_greek, greek_latin),
+                    _purity(english_latin, english_greek),
+                ),
+            )
+        lines, counts = lines[:2], counts[:2]
+
+    (ga, la), (gb, lb) = counts
+    if ga > gb or (ga == gb and la <= lb):
+        return SentencePair(lines[0], lines[1], min(_purity(ga, la), _purity(lb, gb)))
+    return SentencePair(lines[1], lines[0], min(_purity(gb, lb), _purity(la, ga)))
+
+
+def classify_sentence_blocks(
+    blocks: Iterable[Sequence[str]],
+) -> Iterator[SentencePair]:
+    """Classify a stream of blocks, skipping blocks of fewer than two lines.
+
+    Letters are counted for CLASSIFY_BATCH_SIZE blocks at a time.
+    """
+    batch: list[Sequence[str]] = []
+    for block in blocks:
+        if len(block) >= 2:
+            batch.append(block)
+        if len(batch) >= CLASSIFY_BATCH_SIZE:
+            yield from _classify_batch(batch)
+            batch = []
+    if batch:
+        yield from _classify_batch(batch)
+
+
+def _classify_batch(blocks: Sequence[Sequence[str]]) -> list[SentencePair]:
+    counts = _script_counts([line for block in blocks for line in block])
+    pairs = []
+    start = 0
+    for block in blocks:
+        end = start + len(block)
+        pairs.append(_classify_block(block, counts[start:end]))
+        start = end
+    return pairs
+
+
+def iter_sentence_blocks(lines: Iterable[str]) -> Iterator[list[str]]:
+    """Runs of non-empty lines (after trim), separated by blank lines."""
+    block: list[str] = []
     for line in lines:
+        line = line.strip()
         if line:
-            cur.append(line)
-        elif cur:
-            blocks.append(cur)
-            cur = []
-    if cur:
-        blocks.append(cur)
-
-    result: list[Phrase] = []
-    for block_lines in blocks:
-        if len(block_lines) < 2:
-            continue
-        greek, english = _assign_greek_english_pair(block_lines[0], block_lines[1])
-        result.append(Phrase(greek=greek, english=english))
-    return result
+            block.append(line)
+        elif block:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def iter_sentence_pairs(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Yield (greek, english) per block of the bilingual sentence format.
+
+    Blocks with fewer than two lines are skipped.
+    """
+    for greek, english, _ in classify_sentence_blocks(iter_sentence_blocks(lines)):
+        yield greek, english
+
+
+def read_sentence_lines(path: Path, digest=None) -> Iterator[str]:
+    """Yield the lines of a UTF-8 file, reading it in chunks.
+
+    Lines are split exactly like str.splitlines() on the whole decoded file.
+
+    Args:
+        path: Source file; a missing file yields nothing
+        digest: hashlib object updated with the raw bytes as they are read
+    """
+    if not path.exists():
+        return
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            if digest is not None:
+                digest.update(chunk)
+            lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+            pending = ""
+            # The last line may continue in the next chunk, as may a "\r\n"
+            last = lines[-1] if lines else ""
+            if last.endswith("\r") or last.splitlines() == [last]:
+                pending = lines.pop()
+            for line in lines:
+                yield line.splitlines()[0]
+    yield from (pending + decoder.decode(b"", final=True)).splitlines()
+
+
+def parse_bilingual_sentence_file(text: str) -> list[Phrase]:
+    """Blocks are runs of non-empty lines (after trim); runs are separated by blank lines."""
+    return [
+        Phrase(greek=greek, english=english)
+        for greek, english in iter_sentence_pairs(text.splitlines())
+    ]
+
+
+def _phrases_json(phrases: list[Phrase]) -> bytes:
+    payload = {"phrases": [p.model_dump(mode="json") for p in phrases]}
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _write_phrases_json(f, pairs: Iterable[tuple[str, str]]) -> int:
+    """Stream the phrases payload of `pairs` to `f`, byte-identical to
+    _phrases_json. Returns the number of phrases written.
+    """
+    f.write(b'{"phrases": [')
+    count = 0
+    for greek, english in pairs:
+        phrase = {"greek": greek, "english": english}
+        if count:
+            f.write(b", ")
+        f.write(json.dumps(phrase, ensure_ascii=False).encode("utf-8"))
+        count += 1
+    f.write(b"]}")
+    return count
+
+
+def sentence_phrases_payload(raw: bytes | None = None) -> bytes:
+    """JSON payload of the phrases artifact for the source file bytes.
+
+    Args:
+        raw: Source file bytes; read from the sentence pairs file if None
+    """
+    if raw is None:
+        src = sentence_pairs_source_path
+        raw = src.read_bytes() if src.exists() else b""
+    text = raw.decode("utf-8") if raw else ""
+    return _phrases_json(parse_bilingual_sentence_file(text))
 
 
 def build_sentence_phrase_artifacts(
     source_path: Path | None = None,
     out_dir: Path | None = None,
+    codec: str = "gzip",
+    deduplicator: PhraseDeduplicator | None = None,
 ) -> tuple[str, Path, Path]:
     """
-    Read source bytes, compute md5[:6], write phrases-{hash}.json.gz and phrases-current.txt.
-    Returns (hash6, gzip_path, manifest_path).
+    Stream the source through the parser into phrases-{hash}.json.gz, hashing it
+    (md5[:6], with PHRASES_FORMAT_VERSION) while reading, then write
+    phrases-current.txt. Memory use does not
+    grow with the source size.
+    The suffix follows the codec spec (see dictionary.compression), e.g. .json.br.
+    With a deduplicator, duplicate phrases are dropped and its settings are part
+    of the hash.
+    Returns (hash6, compressed_path, manifest_path).
     """
     src = source_path or sentence_pairs_source_path
     out = out_dir or output_directory
     out.mkdir(parents=True, exist_ok=True)
 
-    raw = src.read_bytes() if src.exists() else b""
-    hash6 = hashlib.md5(raw).hexdigest()[:6]
-    text = raw.decode("utf-8") if raw else ""
-    phrases = parse_bilingual_sentence_file(text)
-
-    payload = {"phrases": [p.model_dump(mode="json") for p in phrases]}
-    json_bytes = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    basename = f"phrases-{hash6}.json.gz"
-    gz_path = out / basename
+    # The hash is only known once the source is read: write to a temporary file
+    digest = hashlib.md5()
+    tmp_path = compressed_path(out / "phrases.json", codec).with_suffix(".tmp")
+    pairs = iter_sentence_pairs(read_sentence_lines(src, digest))
+    if deduplicator is not None:
+        pairs = deduplicator.filter_pairs(pairs)
+    f = open_compressor(tmp_path, codec)
+    try:
+        _write_phrases_json(f, pairs)
+    finally:
+        f.close()
+    hash6 = _phrases_hash(digest, deduplicator)
+    payload_path = compressed_path(out / f"phrases-{hash6}.json", codec)
     manifest_path = out / "phrases-current.txt"
+    os.replace(tmp_path, payload_path)
+
+    manifest_path.write_text(payload_path.name + "\n", encoding="utf-8")
+    return hash6, payload_path, manifest_path
+
+
+def _phrases_hash(digest, deduplicator: PhraseDeduplicator | None) -> str:
+    """hash6 of a phrases payload from the md5 of its source bytes: adds the
+    format version and the dedup settings, which also change the payload.
+    """
+    digest.update(f"format:{PHRASES_FORMAT_VERSION}".encode())
+    if deduplicator is not None:
+        digest.update(deduplicator.fingerprint)
+    return digest.hexdigest()[:6]
 
-    with gzip.GzipFile(filename=str(gz_path), mode="wb", mtime=0) as f:
-        f.write(json_bytes)
 
-    manifest_path.write_text(basename + "\n", encoding="utf-8")
-    return hash6, gz_path, manifest_path
+def split_phrase_shards(
+    phrases: Iterable[Phrase], shard_size: int = PHRASE_SHARD_SIZE
+) -> Iterator[list[Phrase]]:
+    """Split phrases into shards of about `shard_size` phrases.
+
+    Shard boundaries are content-defined: a shard ends after a phrase whose
+    hash is 0 modulo `shard_size` (bounded to 1/4..4x the size). Inserting or
+    removing a phrase then changes only the shard containing it, where fixed
+    counts would shift every later shard.
+    """
+    min_size, max_size = max(1, shard_size // 4), shard_size * 4
+    current: list[Phrase] = []
+    for phrase in phrases:
+        current.append(phrase)
+        digest = hashlib.md5(phrase.greek.encode("utf-8")).digest()
+        boundary = int.from_bytes(digest[:4], "little") % shard_size == 0
+        if (boundary and len(current) >= min_size) or len(current) >= max_size:
+            yield current
+            current = []
+    if current:
+        yield current
+
+
+def build_sharded_sentence_phrase_artifacts(
+    source_path: Path | None = None,
+    out_dir: Path | None = None,
+    codec: str = "gzip",
+    shard_size: int = PHRASE_SHARD_SIZE,
+    deduplicator: PhraseDeduplicator | None = None,
+) -> tuple[PhraseShardManifest, Path]:
+    """
+    Write content-hashed phrases-shard-{sha256}.json.gz files and the
+    phrases-shards-current.json manifest listing them in order, with the range
+    of phrase indices each one holds. The manifest records the hash of the
+    matching build_sentence_phrase_artifacts payload. Shards of earlier builds
+    with the same codec that are no longer listed are removed.
+    Returns (manifest, manifest_path).
+    """
+    src = source_path or sentence_pairs_source_path
+    out = out_dir or output_directory
+    out.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.md5()
+    pairs = iter_sentence_pairs(read_sentence_lines(src, digest))
+    if deduplicator is not None:
+        pairs = deduplicator.filter_pairs(pairs)
+    phrases = (Phrase(greek=greek, english=english) for greek, english in pairs)
+
+    shards: list[PhraseShard] = []
+    start = 0
+    for shard_phrases in split_phrase_shards(phrases, shard_size):
+        json_bytes = _phrases_json(shard_phrases)
+        # The full digest: clients and the publish script treat a shard of the
+        # same name as the same content
+        shard_hash = hashlib.sha256(json_bytes).hexdigest()
+        shard_path = compressed_path(out / f"phrases-shard-{shard_hash}.json", codec)
+        if not shard_path.exists():
+            f = open_compressor(shard_path, codec)
+            try:
+                f.write(json_bytes)
+            finally:
+                f.close()
+        shards.append(
+            PhraseShard(
+                file=shard_path.name,
+                hash=shard_hash,
+                start=start,
+                count=len(shard_phrases),
+            )
+        )
+        start += len(shard_phrases)
+
+    # Only shards of this codec: another codec's manifest may list the others
+    suffix = "".join(compressed_path(Path("phrases.json"), codec).suffixes)
+    listed = {shard.file for shard in shards}
+    for stale in out.glob(f"phrases-shard-*{suffix}"):
+        if stale.name not in listed:
+            stale.unlink()
+
+    manifest = PhraseShardManifest(
+        phrases_hash=_phrases_hash(digest, deduplicator), count=start, shards=shards
+    )
+    manifest_path = out / SHARD_MANIFEST_NAME
+    manifest_path.write_text(manifest.model_dump_json(indent=2), encoding="utf-8")
+    return manifest, manifest_path
+
+
+def print_confidence_report(source_path: Path | None = None, limit: int = 20) -> None:
+    """Print how confidently the source's blocks were classified."""
+    src = source_path or sentence_pairs_source_path
+    blocks = iter_sentence_blocks(read_sentence_lines(src))
+    pairs = list(classify_sentence_blocks(blocks))
+    low = sorted(
+        (pair for pair in pairs if pair.confidence < LOW_CONFIDENCE),
+        key=lambda pair: pair.confidence,
+    )
+    print(f"pairs={len(pairs)} below {LOW_CONFIDENCE}: {len(low)}")
+    for pair in low[:limit]:
+        print(f"  {pair.confidence:.2f}  {pair.greek!r} / {pair.english!r}")
 
 
 if __name__ == "__main__":
-    h, gz, manifest = build_sentence_phrase_artifacts()
-    print(f"hash={h}\n{gz}\n{manifest}")
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-c",
+        "--codec",
+        default="gzip",
+        help="Compression codec spec, e.g. gzip:6, zstd:19, brotli:11 (default: gzip)",
+    )
+    parser.add_argument(
+        "--shards",
+        action="store_true",
+        help="Write content-hashed shards and phrases-shards-current.json instead",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=PHRASE_SHARD_SIZE,
+        help=f"Average phrases per shard (default: {PHRASE_SHARD_SIZE})",
+    )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help=f"Only list pairs classified with confidence below {LOW_CONFIDENCE}",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Keep exact and near-duplicate phrases",
+    )
+    args = parser.parse_args()
+    deduplicator = None if args.no_dedup else PhraseDeduplicator()
+    if args.report:
+        print_confidence_report()
+    elif args.shards:
+        manifest, manifest_path = build_sharded_sentence_phrase_artifacts(
+            codec=args.codec, shard_size=args.shard_size, deduplicator=deduplicator
+        )
+        print(f"phrases={manifest.count} shards={len(manifest.shards)}")
+        print(manifest_path)
+    else:
+        h, payload_path, manifest = build_sentence_phrase_artifacts(
+            codec=args.codec, deduplicator=deduplicator
+        )
+        print(f"hash={h}\n{payload_path}\n{manifest}")
+    if deduplicator is not None and not args.report:
+        print(deduplicator.report())
@@ -0,0 +1,128 @@
+"""Synthetic pipeline inputs of a chosen size, for benchmarks.
+
+Writes an io directory laid out like the real one: dict.db with the words
+and translations tables the extraction queries read, and phrases/ with
+greek-50k.txt, phrases-selected.json and sentence-pairs.txt. Every input
+grows linearly with `scale`. The data is random but deterministic for a
+seed, with accented Greek forms, Zipf-distributed frequencies and sentence
+pairs in both line orders.
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+from pathlib import Path
+
+from dictionary.db import WORD_COLUMNS
+from dictionary.index_db import index_db
+
+# Entries per unit of scale
+LEMMAS_PER_SCALE = 500
+SELECTED_PHRASES_PER_SCALE = 300
+SENTENCE_PAIRS_PER_SCALE = 400
+
+_LETTERS = "αβγδεζηθικλμνξοπρστυφχψω"
+_ACCENTED = {"α": "ά", "ε": "έ", "η": "ή", "ι": "ί", "ο": "ό", "υ": "ύ", "ω": "ώ"}
+_CASES = ("Nom", "Gen", "Acc")
+_NUMBERS = ("Sing", "Plur")
+_GENDERS = ("Masc", "Fem", "Neut")
+_PARTS_OF_SPEECH = ("NOUN", "VERB", "ADJ", "ADV")
+
+
+def generate_synthetic_io(io_dir: Path, scale: int = 1, seed: int = 0) -> None:
+    """Write synthetic dict.db and phrases/ into io_dir, replacing existing ones."""
+    rng = random.Random(seed)
+    phrases_dir = io_dir / "phrases"
+    phrases_dir.mkdir(parents=True, exist_ok=True)
+
+    forms = _write_db(io_dir / "dict.db", LEMMAS_PER_SCALE * scale, rng)
+
+    ranked = rng.sample(forms, len(forms) // 2)
+    with open(phrases_dir / "greek-50k.txt", "w", encoding="utf-8") as f:
+        for rank, form in enumerate(ranked, start=1):
+            f.write(f"{form} {1_000_000 // rank}\n")
+
+    phrases = []
+    n_phrases = min(len(forms), SELECTED_PHRASES_PER_SCALE * scale)
+    for form in rng.sample(forms, n_phrases):
+        other = rng.choice(forms)
+        phrases.append(
+            {
+                "word": form,
+                "greek_phrase": f"Το **{form}** και {other}.",
+                "english_phrase": f"The **{form}** and {other}.",
+            }
+        )
+    with open(phrases_dir / "phrases-selected.json", "w", encoding="utf-8") as f:
+        json.dump({"partitions": [{"phrases": phrases}]}, f, ensure_ascii=False)
+
+    with open(phrases_dir / "sentence-pairs.txt", "w", encoding="utf-8") as f:
+        for i in range(SENTENCE_PAIRS_PER_SCALE * scale):
+            greek = " ".join(rng.choice(forms) for _ in range(5)).capitalize() + "."
+            english = f"English sentence number {i}."
+            first, second = (greek, english) if rng.random() < 0.5 else (english, greek)
+            f.write(f"{first}\n{second}\n\n")
+
+
+def _write_db(path: Path, n_lemmas: int, rng: random.Random) -> list[str]:
+    """Write dict.db with n_lemmas lemmas of six forms each; return the forms."""
+    path.unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    try:
+        columns = ", ".join(f"{column} TEXT" for column in WORD_COLUMNS)
+        conn.execute(f"CREATE TABLE words ({columns})")
+        conn.execute(
+            "CREATE TABLE translations (src TEXT, dest TEXT, src_lemma TEXT,"
+            " dest_lemma TEXT)"
+        )
+        rows = []
+        translations = []
+        for i in range(n_lemmas):
+            lemma = _word(rng, rng.randint(4, 9))
+            pos = rng.choice(_PARTS_OF_SPEECH)
+            for ptosi in _CASES:
+                for number in _NUMBERS:
+                    if ptosi == "Nom" and number == "Sing":
+                        form = lemma
+                    else:
+                        form = lemma[:-1] + rng.choice(_LETTERS)
+                    record = dict.fromkeys(WORD_COLUMNS)
+                    record.update(form=form, lemma=lemma, pos=pos, number=number)
+                    if pos == "VERB":
+                        record.update(person="3", tense="Pres")
+                    else:
+                        record["ptosi"] = ptosi
+                    if pos == "NOUN":
+                        record["gender"] = rng.choice(_GENDERS)
+                    if rng.random() < 0.05:
+                        record["tags"] = "Incomplete"
+                    rows.append(tuple(record.values()))
+            translations.append(("el", "en", lemma, f"word{i} thing"))
+            if rng.random() < 0.5:
+                translations.append(("el", "ru", lemma, f"слово{i}"))
+        placeholders = ", ".join("?" * len(WORD_COLUMNS))
+        conn.executemany(f"INSERT INTO words VALUES ({placeholders})", rows)
+        conn.executemany("INSERT INTO translations VALUES (?, ?, ?, ?)", translations)
+        conn.commit()
+    finally:
+        conn.close()
+    index_db(path)
+    return [row[0] for row in rows]
+
+
+def _word(rng: random.Random, length: int) -> str:
+    """Random Greek word; the letter at a random position is accented if a vowel."""
+    letters = [rng.choice(_LETTERS) for _ in range(length)]
+    i = rng.randrange(length)
+    letters[i] = _ACCENTED.get(letters[i], letters[i])
+    return "".join(letters)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic pipeline inputs")
+    parser.add_argument("io_dir", type=Path)
+    parser.add_argument("-s", "--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_synthetic_io(args.io_dir, args.scale, args.seed)
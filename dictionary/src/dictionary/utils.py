@@ -1,49 +1,492 @@
+import ast
+import enum
+import hashlib
+import importlib
+import importlib.util
+import inspect
 import json
 import os
+import pickle
 from pathlib import Path
-from typing import TypeVar
+from typing import Iterator, Sequence, TypeVar
 
 from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+
+from dictionary.compression import compressed_path, open_compressor
+from dictionary.config import incremental_build
 
 T = TypeVar("T")
 
+# Cached stages by "module:qualname", used to resolve recorded dependencies.
+_stages: dict[str, object] = {}
+# One set of called stage names per stage currently being built.
+_building: list[set[str]] = []
+# File digests memoized by (path, size, mtime_ns).
+_file_digests: dict[tuple[str, int, int], str] = {}
+# Results materialized in this process, by stage name. Shared, so never mutate them.
+_memo: dict[str, object] = {}
+# Names of the stages each memoized stage called.
+_memo_stages: dict[str, set[str]] = {}
+# Package whose modules count as a stage's code.
+_PACKAGE = __name__.split(".")[0]
+# Source files of the package modules each source file imports, by path.
+_source_imports: dict[Path, set[Path]] = {}
+# Errors meaning a cache file cannot be loaded and must be rebuilt. Pickles of
+# renamed or moved classes raise AttributeError or ImportError.
+_LOAD_ERRORS = (
+    json.JSONDecodeError,
+    IOError,
+    EOFError,
+    ValueError,
+    pickle.UnpicklingError,
+    AttributeError,
+    ImportError,
+)
+# Streamed JSON is written in chunks of about this many bytes.
+_STREAM_CHUNK_SIZE = 1 << 20
+
+
+class CacheFormat(enum.Enum):
+    JSON = "json"  # indented JSON, for shipped artifacts and inspection
+    COMPACT_JSON = "compact_json"  # JSON without whitespace, for shipped artifacts
+    BINARY = "binary"  # pickled objects, for intermediate stages
+
+
+def file_digest(path: Path) -> str | None:
+    """Return sha256 of the file content, or None if the file does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+    digest = _file_digests.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _file_digests[memo_key] = digest
+    return digest
+
+
+def cache_to_file(
+    path: Path,
+    data_type: TypeAdapter[T] | type[BaseModel],
+    inputs: Sequence[Path] = (),
+    cache_format: CacheFormat = CacheFormat.JSON,
+    codecs: Sequence[str] = (),
+    incremental: bool = False,
+):
+    """Decorator to cache function results to a file.
+
+    The cache is content-addressed. Next to the cache file, `<name>.key` records
+    digests of the stage's input files, of the source of the module defining
+    the stage and of every package module it imports (transitively), and of
+    the cache files of every cached stage it called. The
+    cached result is reused only while all of them are unchanged; upstream
+    stages are brought up to date first.
+
+    Within a process each stage is loaded or built at most once: the result is
+    kept in memory and returned as is to every later caller until
+    `invalidate_stage` drops it.
+
+    Binary caches skip JSON parsing and validation on load. They are only
+    valid for the exact data type they were written with, so the key also
+    records a digest of the data type's JSON schema.
 
-def cache_to_file(path: Path, data_type: TypeAdapter[T] | type[BaseModel]):
-    """Decorator to cache function results to a JSON file.
+    COMPACT_JSON is streamed to disk one list element at a time, so the full
+    serialized string is never held in memory. With `codecs`, compressed copies
+    (`<name>.gz` etc.) and `<name>.sha256`, the digest of the uncompressed
+    content, are written in the same pass.
+
+    An `incremental` stage patches its previous output in incremental builds
+    (see config.incremental_build), so its key records the mode it was built
+    in. A patched output is reused by later incremental builds only; a full
+    build rebuilds it.
 
     Args:
         path: Path to the cache file
         data_type: Either a Pydantic BaseModel class or a TypeAdapter for complex types like lists
+        inputs: Source files the stage reads directly
+        cache_format: JSON or COMPACT_JSON for shipped artifacts, BINARY otherwise
+        codecs: Compressions to write alongside a COMPACT_JSON artifact
+        incremental: Whether the stage's output depends on incremental mode
     """
+    if codecs and cache_format is not CacheFormat.COMPACT_JSON:
+        raise ValueError("codecs require the COMPACT_JSON cache format")
 
     def decorator(func):
+        name = _stage_name(func)
+        key_path = path.with_name(path.name + ".key")
+        artifact_paths = _artifact_paths(path, codecs)
+        source_path = Path(inspect.getsourcefile(func))
+        schema_digest = _schema_digest(data_type)
+
+        def current_key() -> dict:
+            return {
+                "code": _code_digest(source_path),
+                "schema": schema_digest,
+                "inputs": {str(p): file_digest(p) for p in inputs},
+            }
+
+        def read_key() -> dict | None:
+            try:
+                return json.loads(key_path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, IOError):
+                return None
+
+        def unchanged_except(*stages) -> bool:
+            """Whether nothing but the given upstream stages changed since the
+            cache file was written. Lets a stage being rebuilt decide whether it
+            can patch its previous output.
+            """
+            key = read_key()
+            if key is None:
+                return False
+            if {k: key.get(k) for k in ("code", "schema", "inputs")} != current_key():
+                return False
+            ignored = {_stage_name(stage) for stage in stages}
+            for stage_name, digest in key.get("stages", {}).items():
+                if stage_name in ignored:
+                    continue
+                stage = _resolve_stage(stage_name)
+                if stage is None:
+                    return False
+                stage.refresh()
+                if file_digest(stage.path) != digest:
+                    return False
+            return True
+
+        def built_for_mode() -> bool:
+            """Whether the cache file suits the requested build mode."""
+            if not incremental or incremental_build():
+                return True
+            return not (read_key() or {}).get("incremental", False)
+
+        def is_fresh() -> bool:
+            if name in _memo:
+                return True
+            return (
+                path.exists()
+                and all(p.exists() for p in artifact_paths)
+                and built_for_mode()
+                and unchanged_except()
+            )
+
+        def load() -> T:
+            if cache_format is CacheFormat.BINARY:
+                with path.open("rb") as f:
+                    return pickle.load(f)
+            with path.open("r", encoding="utf-8") as f:
+                content = f.read()
+                if isinstance(data_type, TypeAdapter):
+                    return data_type.validate_json(content)
+                else:
+                    return data_type.model_validate_json(content)
+
+        def build(*args, **kwargs) -> T:
+            _building.append(set())
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                called = _building.pop()
+            os.makedirs(path.parent, exist_ok=True)
+            if cache_format is CacheFormat.COMPACT_JSON:
+                write_json_artifact(path, result, codecs)
+            else:
+                tmp_path = _tmp(path)
+                if cache_format is CacheFormat.BINARY:
+                    with tmp_path.open("wb") as f:
+                        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                else:
+                    _write_json(tmp_path, result, data_type, indent=2)
+                os.replace(tmp_path, path)
+            key = current_key()
+            key["stages"] = {
+                stage_name: file_digest(_stages[stage_name].path)
+                for stage_name in sorted(called)
+            }
+            if incremental:
+                key["incremental"] = incremental_build()
+            key_path.write_text(json.dumps(key, indent=2), encoding="utf-8")
+            _memo[name] = result
+            _memo_stages[name] = called
+            return result
+
         def wrapper(*args, **kwargs):
-            if path.exists():
+            if _building:
+                _building[-1].add(name)
+            if name in _memo:
+                return _memo[name]
+            if is_fresh():
                 try:
-                    with path.open("r", encoding="utf-8") as f:
-                        content = f.read()
-                        if isinstance(data_type, TypeAdapter):
-                            return data_type.validate_json(content)
-                        else:
-                            return data_type.model_validate_json(content)
-                except (json.JSONDecodeError, IOError, ValueError):
+                    result = load()
+                except _LOAD_ERRORS:
                     pass
-            result = func(*args, **kwargs)
-            os.makedirs(path.parent, exist_ok=True)
-            with path.open("w", encoding="utf-8") as f:
-                if isinstance(data_type, TypeAdapter):
-                    f.write(
-                        data_type.dump_json(result, indent=2, exclude_none=True).decode(
-                            "utf-8"
-                        )
-                    )
                 else:
-                    if isinstance(result, BaseModel):
-                        f.write(result.model_dump_json(indent=2, exclude_none=True))
-                    else:
-                        json.dump(result, f, ensure_ascii=False, indent=2)
-            return result
+                    _memo[name] = result
+                    _memo_stages[name] = set((read_key() or {}).get("stages", {}))
+                    return result
+            return build(*args, **kwargs)
+
+        def refresh() -> bool:
+            """Rebuild the cache file if it is stale, without loading it.
 
+            Returns:
+                Whether the stage was rebuilt
+            """
+            if is_fresh():
+                return False
+            build()
+            return True
+
+        def load_previous() -> T | None:
+            """Load the cache file as it is on disk, fresh or not; None if unreadable."""
+            try:
+                return load()
+            except _LOAD_ERRORS:
+                return None
+
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__module__ = func.__module__
+        wrapper.path = path
+        wrapper.is_fresh = is_fresh
+        wrapper.refresh = refresh
+        wrapper.load_previous = load_previous
+        wrapper.unchanged_except = unchanged_except
+        _stages[name] = wrapper
         return wrapper
 
     return decorator
+
+
+def invalidate_stage(stage=None) -> None:
+    """Drop in-memory results so the next call reloads or rebuilds them.
+
+    Args:
+        stage: A cached stage function. Its result and the results of every
+            memoized stage that depends on it are dropped. None drops all.
+    """
+    if stage is None:
+        _memo.clear()
+        _memo_stages.clear()
+        return
+    dropped = {_stage_name(stage)}
+    changed = True
+    while changed:
+        changed = False
+        for name, called in _memo_stages.items():
+            if name not in dropped and called & dropped:
+                dropped.add(name)
+                changed = True
+    for name in dropped:
+        _memo.pop(name, None)
+        _memo_stages.pop(name, None)
+
+
+def _stage_name(func) -> str:
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def _resolve_stage(name: str):
+    """Find a cached stage by its "module:qualname", importing the module if needed."""
+    if name not in _stages:
+        module_name = name.split(":", 1)[0]
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            return None
+    return _stages.get(name)
+
+
+def _write_json(
+    path: Path,
+    result,
+    data_type: TypeAdapter | type[BaseModel],
+    indent: int | None,
+) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        if isinstance(data_type, TypeAdapter):
+            f.write(
+                data_type.dump_json(result, indent=indent, exclude_none=True).decode(
+                    "utf-8"
+                )
+            )
+        else:
+            if isinstance(result, BaseModel):
+                f.write(result.model_dump_json(indent=indent, exclude_none=True))
+            else:
+                json.dump(result, f, ensure_ascii=False, indent=indent)
+
+
+def write_json_artifact(path: Path, result, codecs: Sequence[str] = ()) -> None:
+    """Write `result` as a COMPACT_JSON stage does: streamed compact JSON, its
+    compressed copies and `<name>.sha256`.
+
+    The file at `path` is replaced last: it is what marks the write as complete.
+    """
+    _write_json_stream(path, result, codecs)
+    for artifact_path in _artifact_paths(path, codecs):
+        os.replace(_tmp(artifact_path), artifact_path)
+    os.replace(_tmp(path), path)
+
+
+def _write_json_stream(path: Path, result, codecs: Sequence[str]) -> None:
+    """Write compact JSON for `path` and, in the same pass, through each codec.
+
+    Everything is written to temporary files next to the final paths (see
+    `_tmp`); the caller moves them into place.
+    """
+    h = hashlib.sha256()
+    compressors = [
+        open_compressor(_tmp(compressed_path(path, codec)), codec) for codec in codecs
+    ]
+    try:
+        with _tmp(path).open("wb") as f:
+            for chunk in _iter_json_chunks(result):
+                f.write(chunk)
+                h.update(chunk)
+                for compressor in compressors:
+                    compressor.write(chunk)
+    finally:
+        for compressor in compressors:
+            compressor.close()
+    if codecs:
+        _tmp(_digest_path(path)).write_text(h.hexdigest() + "\n", encoding="utf-8")
+
+
+def _iter_json_chunks(result) -> Iterator[bytes]:
+    """Compact JSON of `result` (None fields excluded) in chunks of about
+    _STREAM_CHUNK_SIZE bytes. Top-level lists and list fields of a top-level
+    model are serialized one element at a time; the output is identical to
+    dumping the whole result at once.
+    """
+    buffer = bytearray()
+    for part in _iter_json_parts(result):
+        buffer += part
+        if len(buffer) >= _STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _iter_json_parts(result) -> Iterator[bytes]:
+    if isinstance(result, list):
+        yield from _iter_json_array(result)
+        return
+    if not isinstance(result, BaseModel):
+        yield to_json(result, exclude_none=True)
+        return
+    yield b"{"
+    first = True
+    for name in type(result).model_fields:
+        value = getattr(result, name)
+        if value is None:
+            continue
+        yield (b"" if first else b",") + to_json(name) + b":"
+        first = False
+        if isinstance(value, list):
+            yield from _iter_json_array(value)
+        else:
+            yield to_json(value, exclude_none=True)
+    yield b"}"
+
+
+def _iter_json_array(values: list) -> Iterator[bytes]:
+    yield b"["
+    for i, value in enumerate(values):
+        if i:
+            yield b","
+        yield to_json(value, exclude_none=True)
+    yield b"]"
+
+
+def _tmp(path: Path) -> Path:
+    return path.with_name(path.name + ".tmp")
+
+
+def _artifact_paths(path: Path, codecs: Sequence[str]) -> list[Path]:
+    """Compressed copies and content hash written next to a COMPACT_JSON file."""
+    paths = [compressed_path(path, codec) for codec in codecs]
+    if codecs:
+        paths.append(_digest_path(path))
+    return paths
+
+
+def _digest_path(path: Path) -> Path:
+    return path.with_name(path.name + ".sha256")
+
+
+def _code_digest(source_path: Path) -> str:
+    """Digest of a stage's module and of every package module it imports,
+    transitively, so that changing a helper module invalidates the stage.
+
+    Only module-level imports are followed. Imports inside functions are
+    either stages, which the key records by their cache files, or CLI helpers.
+    """
+    sources = set()
+    pending = [source_path]
+    while pending:
+        path = pending.pop()
+        if path not in sources:
+            sources.add(path)
+            pending.extend(_package_imports(path))
+    h = hashlib.sha256()
+    for digest in sorted(file_digest(path) or "" for path in sources):
+        h.update(digest.encode())
+    return h.hexdigest()
+
+
+def _package_imports(source_path: Path) -> set[Path]:
+    """Source files of the package modules imported at module level."""
+    imports = _source_imports.get(source_path)
+    if imports is None:
+        tree = ast.parse(source_path.read_bytes(), filename=str(source_path))
+        names = set()
+        for node in _module_level_imports(tree.body):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif node.level == 0 and node.module:
+                # `from package import module` imports a module too
+                names.add(node.module)
+                names.update(f"{node.module}.{alias.name}" for alias in node.names)
+        imports = set()
+        for name in names:
+            if name == _PACKAGE or name.startswith(_PACKAGE + "."):
+                path = _module_source(name)
+                if path is not None:
+                    imports.add(path)
+        _source_imports[source_path] = imports
+    return imports
+
+
+def _module_level_imports(nodes) -> Iterator[ast.Import | ast.ImportFrom]:
+    for node in nodes:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield from _module_level_imports(ast.iter_child_nodes(node))
+
+
+def _module_source(name: str) -> Path | None:
+    """Source file of a module, None if the name is not a module."""
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    return Path(spec.origin)
+
+
+def _schema_digest(data_type: TypeAdapter | type[BaseModel]) -> str:
+    if isinstance(data_type, TypeAdapter):
+        schema = data_type.json_schema()
+    else:
+        schema = data_type.model_json_schema()
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()
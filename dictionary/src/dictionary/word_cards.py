@@ -1,17 +1,29 @@
 from collections import defaultdict
 
-from dictionary.config import word_cards_cache_path
+from dictionary.config import incremental_build, phrases_per_card, word_cards_cache_path
 from dictionary.data_types import Phrase, WordCard
+from dictionary.phrase_index import create_phrase_index
 from dictionary.phrases import extract_phrases
-from dictionary.utils import cache_to_file
+from dictionary.utils import CacheFormat, cache_to_file
 from dictionary.words import create_words_stage_2
 from pydantic import TypeAdapter
 
 
-@cache_to_file(word_cards_cache_path, TypeAdapter(list[WordCard]))
+@cache_to_file(
+    word_cards_cache_path,
+    TypeAdapter(list[WordCard]),
+    cache_format=CacheFormat.BINARY,
+    incremental=True,
+)
 def create_word_cards() -> list[WordCard]:
-    """Create one WordCard per form in form->phrase mapping"""
+    """Create one WordCard per form in form->phrase mapping
+
+    The curated phrase comes first, followed by the best other phrases of the
+    phrase index, up to config.phrases_per_card.
+    In incremental mode cards keep the order of the previous output.
+    """
     form_phrase: dict[str, Phrase] = extract_phrases()
+    phrase_index = create_phrase_index()
     words = create_words_stage_2()
     form_to_indices: dict[str, list[int]] = defaultdict(list)
     for idx, word in enumerate(words):
@@ -28,13 +40,24 @@ def create_word_cards() -> list[WordCard]:
             if lemma_idx != -1:
                 lemma_indices.add(lemma_idx)
         lemma_indices_list = sorted(lemma_indices)
+        phrases = [phrase]
+        for other in phrase_index.get(form):
+            if len(phrases) >= phrases_per_card:
+                break
+            if other.greek != phrase.greek:
+                phrases.append(other)
 
         word_card = WordCard(
             form=form,
-            phrases=[phrase],
+            phrases=phrases,
             word_indices=word_indices,
             lemma_indices=lemma_indices_list,
         )
         word_cards.append(word_card)
 
+    if incremental_build():
+        # Stable sort: previous cards keep their order, new ones are appended
+        previous = create_word_cards.load_previous() or []
+        previous_order = {card.form: idx for idx, card in enumerate(previous)}
+        word_cards.sort(key=lambda x: previous_order.get(x.form, len(previous_order)))
     return word_cards
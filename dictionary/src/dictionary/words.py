@@ -1,18 +1,27 @@
-import sqlite3
 import re
 
-from dictionary.config import db_path, slim_words_cache_path, enriched_words_cache_path
+from dictionary.config import (
+    db_path,
+    enriched_words_cache_path,
+    incremental_build,
+    slim_words_cache_path,
+)
 from dictionary.data_types import PartOfSpeechEnglish, Phrase, Word
+from dictionary.db import query_word_records_by_forms, query_word_records_by_lemmas
 from dictionary.lemmas import create_lemmas
-from dictionary.orm import word_from_record
+from dictionary.orm import WordRecord, word_record_from_record
 from dictionary.phrases import extract_phrases
 from dictionary.word_ranking import create_word_ranking
 from dictionary.accentless import drop_greek_accents, forms_to_exclude
-from dictionary.utils import cache_to_file
+from dictionary.utils import CacheFormat, cache_to_file
 from pydantic import TypeAdapter
 
 
-@cache_to_file(enriched_words_cache_path, TypeAdapter(list[Word]))
+@cache_to_file(
+    enriched_words_cache_path,
+    TypeAdapter(list[Word]),
+    cache_format=CacheFormat.BINARY,
+)
 def create_words_stage_2() -> list[Word]:
     """Enriches words with lemma index"""
     words: list[Word] = create_words_stage_1()
@@ -28,7 +37,13 @@ def create_words_stage_2() -> list[Word]:
     return enriched_words
 
 
-@cache_to_file(slim_words_cache_path, TypeAdapter(list[Word]))
+@cache_to_file(
+    slim_words_cache_path,
+    TypeAdapter(list[Word]),
+    inputs=[db_path],
+    cache_format=CacheFormat.BINARY,
+    incremental=True,
+)
 def create_words_stage_1() -> list[Word]:
     """Creates the list of words occuring in phrases.
 
@@ -36,34 +51,55 @@ def create_words_stage_1() -> list[Word]:
     - Take all word forms occuring in io/phrases.json values.
        Remove markup when parsing. Bring to lower case.
     - Query dict.db for respective word forms.
-    - Construct Word objects from the query results.
+    - Construct compact WordRecord objects from the query results.
     - Create a set of lemmas.
     - Query dict.db for all word forms for these lemmas.
-    - Construct Word objects.
-    - Add these Word objects to the set.
-    - Enrich Word objects with word ranks (io/word_ranking.json) and phrases.
+    - Construct WordRecord objects.
+    - Add these WordRecord objects to the set.
+    - Enrich records with word ranks (io/output/word_ranking.bin) and phrases.
     - Sort words by key: (whether occuring in keys of phrases.json, rank)
-    - Cache output to io/words.json.
+    - Convert records to Word objects.
+    - In incremental mode, only query forms and lemmas new since the previous
+      output and append the new words to it.
+    - Cache output to io/output/slim_words.bin.
     """
     form_phrase: dict[str, Phrase] = extract_phrases()
     key_forms = set(form_phrase.keys())  # Forms used as keys
     sort_key = lambda w: _sort_key(key_forms, w)
     value_forms = _extract_value_forms(form_phrase)
     all_forms = key_forms | value_forms
-    words: set[Word] = _query_words_from_db(all_forms)
-    lemmas = {word.lemma for word in words}
+    previous = _previous_words()
+    known_forms = {word.form for word in previous}
+    known_lemmas = {word.lemma for word in previous}
+    words: set[WordRecord] = _query_words_from_db(all_forms - known_forms)
+    lemmas = {word.lemma for word in words} - known_lemmas
     words |= _query_words_by_lemmas(lemmas)
     words = {w for w in words if _word_filter(w)}
     accentless_form_rank = create_word_ranking()
-    enriched_words: set[Word] = set()
     for word in words:
         accentless_form = drop_greek_accents(word.form)
-        frequency_rank: int = accentless_form_rank.get(accentless_form, None)
-        enriched_word = word.model_copy(update={"frequency_rank": frequency_rank})
-        enriched_words.add(enriched_word)
-    enriched_words_list = list(enriched_words)
-    enriched_words_list.sort(key=sort_key)
-    return enriched_words_list
+        word.frequency_rank = accentless_form_rank.get(accentless_form, None)
+    words_list = list(words)
+    words_list.sort(key=sort_key)
+    new_words = [word.to_word() for word in words_list]
+    if previous:
+        known_words = set(previous)
+        new_words = [word for word in new_words if word not in known_words]
+    return previous + new_words
+
+
+def _previous_words() -> list[Word]:
+    """Previous stage 1 output to patch in incremental mode, or [] to rebuild.
+
+    Patching is possible when only phrases changed: then only forms and lemmas
+    missing from the previous output are queried, and the new words are
+    appended so existing word indices stay valid.
+    """
+    if not incremental_build():
+        return []
+    if not create_words_stage_1.unchanged_except(extract_phrases):
+        return []
+    return create_words_stage_1.load_previous() or []
 
 
 _greek_word_pattern = re.compile(
@@ -87,64 +123,19 @@ def _extract_value_forms(phrases_map: dict) -> set[str]:
     return value_forms
 
 
-def _batch_items(items: set[str], batch_size: int = 100) -> list[list[str]]:
-    """Split a set of items into batches of specified size."""
-    items_list = list(items)
-    return [
-        items_list[i : i + batch_size] for i in range(0, len(items_list), batch_size)
-    ]
-
-
-def _query_words_from_db(all_forms: set[str]) -> set[Word]:
-    """Query dict.db for given word forms and return dict of (form, lemma) -> Word."""
-    if not db_path.exists():
-        raise FileNotFoundError(f"Database not found at {db_path}")
-    db_uri = f"file:{db_path}?mode=ro"
-    words: set[Word] = set()
-    with sqlite3.connect(db_uri, uri=True) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        batches = _batch_items(all_forms, batch_size=100)
-        for batch in batches:
-            placeholders = ",".join("?" * len(batch))
-            query = f"SELECT * FROM words WHERE form IN ({placeholders})"
-            cursor.execute(query, batch)
-            for row in cursor.fetchall():
-                record = dict(row)
-                if not record.get("pos"):
-                    continue
-                word = word_from_record(record)
-                words.add(word)
-    return words
-
-
-def _query_words_by_lemmas(lemmas: set[str]) -> set[Word]:
+def _query_words_from_db(all_forms: set[str]) -> set[WordRecord]:
+    """Query dict.db for given word forms."""
+    return {word_record_from_record(r) for r in query_word_records_by_forms(all_forms)}
+
+
+def _query_words_by_lemmas(lemmas: set[str]) -> set[WordRecord]:
     """Query dict.db for all word forms that have the given lemmas."""
-    if not db_path.exists():
-        raise FileNotFoundError(f"Database not found at {db_path}")
-    db_uri = f"file:{db_path}?mode=ro"
-    words: set[Word] = set()
-    with sqlite3.connect(db_uri, uri=True) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        if not lemmas:
-            return words
-        batches = _batch_items(lemmas, batch_size=100)
-        for batch in batches:
-            placeholders = ",".join("?" * len(batch))
-            cursor.execute(
-                f"SELECT * FROM words WHERE lemma IN ({placeholders})", batch
-            )
-            for row in cursor.fetchall():
-                record = dict(row)
-                if not record.get("pos"):
-                    continue
-                word = word_from_record(record)
-                words.add(word)
-    return words
-
-
-def _sort_key(key_forms, w: Word) -> tuple[bool, int]:
+    if not lemmas:
+        return set()
+    return {word_record_from_record(r) for r in query_word_records_by_lemmas(lemmas)}
+
+
+def _sort_key(key_forms, w: WordRecord) -> tuple[bool, int]:
     in_keys = w.form in key_forms
     return (
         not in_keys,
@@ -152,7 +143,7 @@ def _sort_key(key_forms, w: Word) -> tuple[bool, int]:
     )
 
 
-def _word_filter(w: Word) -> bool:
+def _word_filter(w: WordRecord) -> bool:
     return (
         len(w.lemma.split()) == 1
         and len(w.form.split()) == 1
@@ -5,7 +5,13 @@
 #   dictionary/io/output/* into repo/phrases/, commit, push. Set NEXT_PUBLIC_PHRASES_BASE_URL to
 #   https://fertilis.github.io/lexico-phrases/phrases (no trailing slash).
 #
-# With a path: copy only to that directory (no git). Run `make sentence_phrases` in dictionary/ first.
+# With a path: copy only to that directory (no git). The payload is rebuilt first.
+#
+# With --shards: also rebuild (`make sentence_phrase_shards`) and publish phrases-shards-current.json
+# and the shards it lists, so clients can fetch only the shards they lack. Published shards that
+# are still listed stay in place; the others are removed.
+#
+# Usage: publish-phrases.sh [--shards] [path]
 
 set -euo pipefail
 REPO_ROOT="$(cd "$(dirname $(realpath "${BASH_SOURCE[0]}"))/.." && pwd)"
@@ -13,9 +19,19 @@ SRC="${REPO_ROOT}/dictionary/io/output"
 REMOTE_URL="${LEXICO_PHRASES_REMOTE:-git@github.com:fertilis/lexico-phrases.git}"
 # Served at {pages-root}/phrases/ — matches spec PHRASES_BASE_URL examples.
 PHRASES_SUBDIR="phrases"
-DEST="${1:-}"
+SHARDS=0
+DEST=""
+for arg in "$@"; do
+  case "${arg}" in
+    --shards) SHARDS=1 ;;
+    *) DEST="${arg}" ;;
+  esac
+done
 
 (cd ${REPO_ROOT}/dictionary && make sentence_phrases)
+if [[ ${SHARDS} -eq 1 ]]; then
+  (cd ${REPO_ROOT}/dictionary && make sentence_phrase_shards)
+fi
 
 if [[ ! -f "${SRC}/phrases-current.txt" ]]; then
   echo "Missing ${SRC}/phrases-current.txt — run 'make sentence_phrases' in dictionary/ first." >&2
@@ -32,13 +48,55 @@ if [[ ! -f "${SRC}/${GZIP_NAME}" ]]; then
   exit 1
 fi
 
+SHARD_MANIFEST="phrases-shards-current.json"
+SHARD_FILES=()
+if [[ ${SHARDS} -eq 1 ]]; then
+  if [[ ! -f "${SRC}/${SHARD_MANIFEST}" ]]; then
+    echo "Missing ${SRC}/${SHARD_MANIFEST}" >&2
+    exit 1
+  fi
+  # The manifest must come from the same source and settings as the payload (phrases-<hash>.json.*)
+  PAYLOAD_HASH="$(cut -d- -f2 <<< "${GZIP_NAME%%.*}")"
+  MANIFEST_HASH="$(grep -o '"phrases_hash": *"[^"]*"' "${SRC}/${SHARD_MANIFEST}" | cut -d'"' -f4)"
+  if [[ "${MANIFEST_HASH}" != "${PAYLOAD_HASH}" ]]; then
+    echo "${SHARD_MANIFEST} is for phrases ${MANIFEST_HASH:-?}, not ${PAYLOAD_HASH}" >&2
+    exit 1
+  fi
+  mapfile -t SHARD_FILES < <(grep -o '"file": *"[^"]*"' "${SRC}/${SHARD_MANIFEST}" | cut -d'"' -f4)
+  for shard in "${SHARD_FILES[@]}"; do
+    if [[ ! -f "${SRC}/${shard}" ]]; then
+      echo "Missing shard ${SRC}/${shard}" >&2
+      exit 1
+    fi
+    if [[ "${shard#*.}" != "${GZIP_NAME#*.}" ]]; then
+      echo "Shard ${shard} does not use the codec of ${GZIP_NAME}" >&2
+      exit 1
+    fi
+  done
+fi
+
 sync_phrases_dir() {
   local target="$1"
   mkdir -p "${target}"
   # Drop stale versioned payloads so the Pages repo does not accumulate old hashes.
-  find "${target}" -maxdepth 1 -type f -name 'phrases-*.json.gz' -delete 2>/dev/null || true
+  find "${target}" -maxdepth 1 -type f -name 'phrases-*.json.*' ! -name 'phrases-shard-*' \
+    -delete 2>/dev/null || true
   cp "${SRC}/phrases-current.txt" "${target}/"
   cp "${SRC}/${GZIP_NAME}" "${target}/"
+  if [[ ${SHARDS} -eq 1 ]]; then
+    # Keep shards that are still listed: unchanged shards keep their hash and stay cached.
+    local existing
+    for existing in "${target}"/phrases-shard-*; do
+      [[ -f "${existing}" ]] || continue
+      if ! printf '%s\n' "${SHARD_FILES[@]}" | grep -qxF "$(basename "${existing}")"; then
+        rm -f "${existing}"
+      fi
+    done
+    cp "${SRC}/${SHARD_MANIFEST}" "${target}/"
+    for shard in "${SHARD_FILES[@]}"; do
+      cp "${SRC}/${shard}" "${target}/"
+    done
+  fi
 }
 
 if [[ -n "${DEST}" ]]; then